@@ -1,5 +1,5 @@
 import axios, { AxiosInstance, AxiosRequestConfig, AxiosResponse } from 'axios';
-import { AuthTokens, ApiError } from '../types';
+import { AuthTokens, ApiError, BatchSubRequest, BatchSubResponse } from '../types';
 
 // Create axios instance with base configuration
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
@@ -108,6 +108,12 @@ class ApiService {
     return response.data;
   }
 
+  // Send several API calls in one round trip; results come back in order
+  async batch<T = any>(requests: BatchSubRequest[]): Promise<BatchSubResponse<T>[]> {
+    const response = await this.post<{ responses: BatchSubResponse<T>[] }>('/api/v1/batch', { requests });
+    return response.responses;
+  }
+
   // Health check
   async healthCheck(): Promise<{ status: string; service: string }> {
     return this.get('/health');
@@ -13,6 +13,20 @@ export interface PaginatedResponse<T> {
   totalPages: number;
 }
 
+// Batch Types (POST /api/v1/batch)
+export interface BatchSubRequest {
+  method?: 'GET' | 'POST' | 'PUT' | 'PATCH' | 'DELETE';
+  path: string;
+  headers?: Record<string, string>;
+  body?: any;
+}
+
+export interface BatchSubResponse<T = any> {
+  status: number;
+  headers: Record<string, string>;
+  body: T;
+}
+
 // Authentication Types
 export interface AuthTokens {
   access_token: string;
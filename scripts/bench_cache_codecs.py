@@ -0,0 +1,91 @@
+"""Compare cache codecs on Contact.to_dict() and Lead.to_dict() payloads.
+
+Reports encode and decode cost and payload size for each available codec
+in shared.codecs, next to the legacy ``json.dumps(default=str)``. Run from
+the repository root:
+
+    python scripts/bench_cache_codecs.py [--iterations 20000]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from shared.codecs import CODECS  # noqa: E402
+
+
+def load_models(service: str):
+    """Import one service's ``models`` module (every service uses that name)."""
+    sys.modules.pop("models", None)
+    sys.path.insert(0, os.path.join(ROOT, "services", service))
+    try:
+        return importlib.import_module("models")
+    finally:
+        sys.path.pop(0)
+
+
+def sample_payloads() -> dict:
+    contact_models = load_models("contact")
+    lead_models = load_models("lead")
+    now = datetime.utcnow()
+
+    contact = contact_models.Contact(
+        id=4821, first_name="Ada", last_name="Lovelace", email="ada@example.com",
+        phone="+44 20 7946 0958", company="Analytical Engines Ltd", title="Head of Research",
+        department="R&D", address_line1="12 St James's Square", city="London", postal_code="SW1Y 4JH",
+        country="United Kingdom", linkedin_url="https://www.linkedin.com/in/ada", is_active=True,
+        lead_source="referral", notes="Met at the Royal Society dinner.", tenant_id=7,
+        created_at=now, updated_at=now
+    )
+    lead = lead_models.Lead(
+        id=913, first_name="Charles", last_name="Babbage", email="charles@example.com",
+        phone="+44 20 7946 0000", company="Difference Engines plc", title="CTO", industry="Manufacturing",
+        company_size="51-200", annual_revenue="10M-50M", status=lead_models.LeadStatus.QUALIFIED,
+        source=lead_models.LeadSource.WEBINAR, score=72.5, priority="high", estimated_value=125000.0,
+        expected_close_date="2025-03-31", assigned_to=42, budget_qualified=True, authority_qualified=True,
+        need_qualified=True, timeline_qualified=False, campaign="Q1 webinar series", utm_source="newsletter",
+        is_active=True, tenant_id=7, created_at=now, updated_at=now
+    )
+    return {"Contact": contact.to_dict(), "Lead": lead.to_dict()}
+
+
+def timed(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    for label, payload in sample_payloads().items():
+        print(f"{label}.to_dict()")
+        print(f"  {'codec':<22} {'encode us':>10} {'decode us':>10} {'bytes':>7}")
+
+        legacy = json.dumps(payload, default=str)
+        encode_us = timed(lambda: json.dumps(payload, default=str), args.iterations)
+        decode_us = timed(lambda: json.loads(legacy), args.iterations)
+        print(f"  {'json (default=str)':<22} {encode_us:10.2f} {decode_us:10.2f} {len(legacy.encode()):7}")
+
+        for name, codec in CODECS.items():
+            encoded = codec.encode(payload)
+            body = encoded[len(codec.prefix):]
+            assert codec.decode(body)["created_at"] == payload["created_at"]
+            encode_us = timed(lambda: codec.encode(payload), args.iterations)
+            decode_us = timed(lambda: codec.decode(body), args.iterations)
+            print(f"  {name:<22} {encode_us:10.2f} {decode_us:10.2f} {len(encoded):7}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
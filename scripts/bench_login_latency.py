@@ -0,0 +1,99 @@
+"""Benchmark proxy latency while logins are hammering the gateway.
+
+Start the gateway and the contact service, then run from the repository
+root:
+
+    python scripts/bench_login_latency.py [--url http://localhost:8000]
+        [--duration 10] [--logins 32] [--probe-path /api/v1/contacts]
+
+``--logins`` concurrent clients post to ``/auth/token`` in a loop while a
+single client measures latency of ``--probe-path``, sent with a bearer
+token. The default probe is a proxied GET, so it covers token checks,
+the upstream call and the response, which is the traffic that suffers
+when bcrypt blocks the event loop; ``/health`` is answered by the
+gateway itself and only shows loop stalls. Run it against a gateway that
+verifies bcrypt on the event loop to compare p99 latency.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def login_loop(client: httpx.AsyncClient, deadline: float, statuses: Counter):
+    while time.monotonic() < deadline:
+        try:
+            response = await client.post("/auth/token", params={"username": "demo", "password": "demo123"})
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+
+
+async def probe_loop(client: httpx.AsyncClient, path: str, token: str, deadline: float, latencies: list,
+                     statuses: Counter):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] += 1
+        await asyncio.sleep(0.01)
+
+
+def report(label: str, latencies: list):
+    if not latencies:
+        print(f"{label:<18} no samples")
+        return
+    print(
+        f"{label:<18} n={len(latencies):<6} p50={percentile(latencies, 0.50):7.2f}ms "
+        f"p99={percentile(latencies, 0.99):7.2f}ms max={max(latencies):7.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--probe-path", default="/api/v1/contacts", help="proxied GET to time")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30.0) as client:
+        response = await client.post("/auth/token", params={"username": "demo", "password": "demo123"})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+        probe_statuses = Counter()
+        baseline = []
+        await probe_loop(
+            client, args.probe_path, token, time.monotonic() + min(args.duration, 3.0), baseline, probe_statuses
+        )
+        report("idle", baseline)
+
+        statuses = Counter()
+        under_load = []
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(
+            probe_loop(client, args.probe_path, token, deadline, under_load, probe_statuses),
+            *[login_loop(client, deadline, statuses) for _ in range(args.logins)]
+        )
+        report("during logins", under_load)
+        print(f"logins: {dict(statuses)} ({sum(statuses.values()) / args.duration:.1f}/s)")
+        print(f"probe statuses: {dict(probe_statuses)}")
+
+        metrics = await client.get("/metrics/auth")
+        if metrics.status_code == 200:
+            print(f"password hash pool: {metrics.json()['password_hash_pool']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
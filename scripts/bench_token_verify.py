@@ -0,0 +1,53 @@
+"""Benchmark JWT verification cost per request, with and without the
+verified-token cache in shared.auth.
+
+Run from the repository root:
+
+    python scripts/bench_token_verify.py [--requests 20000] [--tokens 50]
+
+``--tokens`` is the number of distinct users whose tokens are replayed,
+so each token is verified ``requests / tokens`` times on average.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jose import jwt  # noqa: E402
+
+from shared.auth import ALGORITHM, SECRET_KEY, create_access_token, decode_token, token_cache  # noqa: E402
+
+
+def run(label: str, verify, tokens, requests: int):
+    sequence = [random.choice(tokens) for _ in range(requests)]
+    started = time.perf_counter()
+    for token in sequence:
+        verify(token)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed / requests * 1e6:8.2f} us/request  ({requests / elapsed:,.0f} req/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+
+    tokens = [
+        create_access_token({"sub": str(user_id), "username": f"user{user_id}", "tenant_id": 1})
+        for user_id in range(args.tokens)
+    ]
+
+    run("jwt.decode (no cache)", lambda token: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]), tokens, args.requests)
+
+    token_cache.clear()
+    run("decode_token (cached)", decode_token, tokens, args.requests)
+    print(f"cache: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
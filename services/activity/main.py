@@ -3,15 +3,17 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from datetime import datetime, time, timedelta
 
-from models import Activity, Base
-from shared.database import DatabaseManager, get_database_url
+from models import Activity, ActivityStatus, Base
+from shared.database import DatabaseManager, QueryStatsMiddleware, get_database_url
 from shared.cache import CacheManager
 from shared.auth import get_current_user
 
 # Initialize database
 database_url = get_database_url("activities")
-db_manager = DatabaseManager(database_url)
+db_manager = DatabaseManager(database_url, "activities")
 
 # Initialize cache
 cache_manager = CacheManager()
@@ -23,6 +25,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Per-request query count and DB time headers
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +67,41 @@ async def health_check():
     return {"status": "healthy", "service": "activity-service"}
 
 
+@app.get("/metrics/db")
+async def db_metrics():
+    """Database connection pool usage."""
+    return db_manager.pool_stats()
+
+
+@app.get("/activities/summary")
+async def activities_summary(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Overdue and due-today open activity counts, for the dashboard."""
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    now = datetime.utcnow()
+    start_of_day = datetime.combine(now.date(), time.min)
+    end_of_day = start_of_day + timedelta(days=1)
+    
+    result = await db.execute(
+        select(
+            func.count().filter(Activity.due_date < now),
+            func.count().filter(
+                Activity.due_date >= start_of_day,
+                Activity.due_date < end_of_day
+            )
+        ).where(
+            Activity.tenant_id == tenant_id,
+            Activity.is_active == True,
+            Activity.status.notin_([ActivityStatus.COMPLETED, ActivityStatus.CANCELLED])
+        )
+    )
+    overdue, due_today = result.one()
+    
+    return {"overdue": overdue, "due_today": due_today}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8004)
\ No newline at end of file
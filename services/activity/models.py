@@ -1,6 +1,6 @@
 """Activity service database models."""
 
-from sqlalchemy import String, Text, Integer, DateTime, Enum as SqlEnum, Boolean
+from sqlalchemy import String, Text, Integer, DateTime, Enum as SqlEnum, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from shared.database import Base
 from typing import Optional
@@ -43,48 +43,56 @@ class Activity(Base):
     """Activity model representing tasks, communications, and interactions."""
     
     __tablename__ = "activities"
+    __table_args__ = (
+        Index("ix_activities_tenant_contact_id", "tenant_id", "contact_id"),
+        Index("ix_activities_tenant_opportunity_id", "tenant_id", "opportunity_id"),
+        Index("ix_activities_tenant_lead_id", "tenant_id", "lead_id"),
+        # Due and overdue lists only consider active activities
+        Index("ix_activities_tenant_active_due_date", "tenant_id", "due_date", postgresql_where=text("is_active")),
+        Index(
+            "ix_activities_tenant_active_assigned_to", "tenant_id", "assigned_to", "due_date",
+            postgresql_where=text("is_active")
+        ),
+    )
     
     # Basic Information
-    subject: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    subject: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
     
     # Classification
     activity_type: Mapped[ActivityType] = mapped_column(
         SqlEnum(ActivityType), 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     status: Mapped[ActivityStatus] = mapped_column(
         SqlEnum(ActivityStatus), 
         default=ActivityStatus.PLANNED, 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     priority: Mapped[ActivityPriority] = mapped_column(
         SqlEnum(ActivityPriority), 
         default=ActivityPriority.MEDIUM, 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     
     # Timing
-    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
-    start_date: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
-    end_date: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
-    completed_date: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
+    due_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    start_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    end_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    completed_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
     # Duration (in minutes)
     estimated_duration: Mapped[Optional[int]] = mapped_column(Integer)
     actual_duration: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Relationships
-    contact_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
-    opportunity_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
-    lead_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    contact_id: Mapped[Optional[int]] = mapped_column(Integer)
+    opportunity_id: Mapped[Optional[int]] = mapped_column(Integer)
+    lead_id: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Assignment and Ownership
-    owner_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
-    assigned_to: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    assigned_to: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Communication Details (for calls, emails, meetings)
     location: Mapped[Optional[str]] = mapped_column(String(200))  # For meetings
@@ -94,7 +102,7 @@ class Activity(Base):
     
     # Follow-up and Reminders
     has_reminder: Mapped[bool] = mapped_column(Boolean, default=False)
-    reminder_date: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
+    reminder_date: Mapped[Optional[datetime]] = mapped_column(DateTime)
     reminder_sent: Mapped[bool] = mapped_column(Boolean, default=False)
     
     # Outcome and Results
@@ -106,10 +114,10 @@ class Activity(Base):
     tags: Mapped[Optional[str]] = mapped_column(String(500))  # Comma-separated tags
     
     # Status tracking
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     
     # Tenant isolation
-    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False)
     
     @property
     def is_overdue(self) -> bool:
@@ -4,6 +4,7 @@ from fastapi import FastAPI, Depends, HTTPException, status, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+import os
 
 from models import Contact, Base
 from schemas import (
@@ -12,17 +13,20 @@ from schemas import (
 )
 from repository import ContactRepository
 from service import ContactService
-from shared.database import DatabaseManager, get_database_url
+from shared.database import DatabaseManager, QueryStatsMiddleware, get_database_url
 from shared.cache import CacheManager
-from shared.auth import get_current_user
+from shared.auth import get_current_user, get_internal_identity
 
 # Initialize database
 database_url = get_database_url("contacts")
-db_manager = DatabaseManager(database_url)
+db_manager = DatabaseManager(database_url, "contacts")
 
 # Initialize cache
 cache_manager = CacheManager()
 
+# Default total_mode of contact search: exact, cached, estimate or none
+SEARCH_TOTAL_MODE = os.getenv("CONTACT_SEARCH_TOTAL_MODE", "cached")
+
 # Create FastAPI app
 app = FastAPI(
     title="Contact Service",
@@ -30,6 +34,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Per-request query count and DB time headers
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -58,8 +65,23 @@ async def shutdown():
 
 
 # Dependency injection
-async def get_db():
-    async for db in db_manager.get_session():
+def sticky_key(current_user: dict) -> str:
+    """Caller identity used for read-your-writes routing."""
+    return f'{current_user["payload"].get("tenant_id", 1)}:{current_user["user_id"]}'
+
+
+async def get_db(current_user: dict = Depends(get_current_user)):
+    async for db in db_manager.get_session(sticky_key(current_user)):
+        yield db
+
+
+async def get_read_db(current_user: dict = Depends(get_current_user)):
+    async for db in db_manager.get_read_session(sticky_key(current_user)):
+        yield db
+
+
+async def get_internal_read_db():
+    async for db in db_manager.get_read_session():
         yield db
 
 
@@ -69,6 +91,12 @@ async def get_contact_service(db: AsyncSession = Depends(get_db)) -> ContactServ
     return ContactService(repository)
 
 
+async def get_read_contact_service(db: AsyncSession = Depends(get_read_db)) -> ContactService:
+    """Get contact service instance for GET routes (read-only, may use a replica)."""
+    repository = ContactRepository(db, cache_manager)
+    return ContactService(repository)
+
+
 # API Routes
 
 @app.get("/health")
@@ -77,6 +105,18 @@ async def health_check():
     return {"status": "healthy", "service": "contact-service"}
 
 
+@app.get("/metrics/db")
+async def db_metrics():
+    """Database connection pool usage."""
+    return db_manager.pool_stats()
+
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """In-process (L1) and Redis (L2) cache hit ratios."""
+    return cache_manager.stats()
+
+
 @app.post("/contacts", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
 async def create_contact(
     contact_data: ContactCreate,
@@ -89,11 +129,23 @@ async def create_contact(
     return await service.create_contact(contact_data)
 
 
+# Static paths must be registered before /contacts/{contact_id}
+@app.get("/contacts/recent", response_model=List[ContactResponse])
+async def get_recent_contacts(
+    limit: int = Query(10, ge=1, le=50, description="Number of contacts to return"),
+    current_user: dict = Depends(get_current_user),
+    service: ContactService = Depends(get_read_contact_service)
+):
+    """Get recently created contacts."""
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    return await service.get_recent_contacts(tenant_id, limit)
+
+
 @app.get("/contacts/{contact_id}", response_model=ContactResponse)
 async def get_contact(
     contact_id: int,
     current_user: dict = Depends(get_current_user),
-    service: ContactService = Depends(get_contact_service)
+    service: ContactService = Depends(get_read_contact_service)
 ):
     """Get a specific contact."""
     tenant_id = current_user["payload"].get("tenant_id", 1)
@@ -131,10 +183,12 @@ async def search_contacts(
     lead_source: str = Query(None, description="Filter by lead source"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: str = Query(None, description="Next-page cursor; overrides page"),
+    total_mode: str = Query(SEARCH_TOTAL_MODE, pattern="^(exact|cached|estimate|none)$", description="How to compute total"),
     sort_by: str = Query("created_at", description="Sort field"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
     current_user: dict = Depends(get_current_user),
-    service: ContactService = Depends(get_contact_service)
+    service: ContactService = Depends(get_read_contact_service)
 ):
     """Search contacts with filters and pagination."""
     tenant_id = current_user["payload"].get("tenant_id", 1)
@@ -146,6 +200,8 @@ async def search_contacts(
         lead_source=lead_source,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        total_mode=total_mode,
         sort_by=sort_by,
         sort_order=sort_order
     )
@@ -157,36 +213,41 @@ async def search_contacts(
 async def get_contacts_by_company(
     company: str,
     current_user: dict = Depends(get_current_user),
-    service: ContactService = Depends(get_contact_service)
+    service: ContactService = Depends(get_read_contact_service)
 ):
     """Get all contacts for a specific company."""
     tenant_id = current_user["payload"].get("tenant_id", 1)
     return await service.get_contacts_by_company(company, tenant_id)
 
 
-@app.get("/contacts/recent", response_model=List[ContactResponse])
-async def get_recent_contacts(
-    limit: int = Query(10, ge=1, le=50, description="Number of contacts to return"),
-    current_user: dict = Depends(get_current_user),
-    service: ContactService = Depends(get_contact_service)
-):
-    """Get recently created contacts."""
-    tenant_id = current_user["payload"].get("tenant_id", 1)
-    return await service.get_recent_contacts(tenant_id, limit)
-
-
 # Internal endpoints for service-to-service communication
 @app.get("/internal/contacts/{contact_id}/validate")
 async def validate_contact_exists(
     contact_id: int,
     tenant_id: int = Query(..., description="Tenant ID"),
-    service: ContactService = Depends(get_contact_service)
+    db: AsyncSession = Depends(get_internal_read_db)
 ):
     """Internal endpoint to validate contact existence."""
+    service = ContactService(ContactRepository(db, cache_manager))
     exists = await service.validate_contact_exists(contact_id, tenant_id)
     return {"exists": exists, "contact_id": contact_id}
 
 
+@app.post("/internal/tenants/{tenant_id}/cache/invalidate")
+async def invalidate_tenant_cache(tenant_id: int, identity: dict = Depends(get_internal_identity)):
+    """Internal endpoint to drop a tenant's cached data, e.g. after a bulk import.
+    
+    Requires a signed internal identity for the same tenant.
+    """
+    if identity["payload"].get("tenant_id", 1) != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to invalidate another tenant's cache"
+        )
+    generation = await cache_manager.bump_tenant_generation(tenant_id)
+    return {"tenant_id": tenant_id, "generation": generation}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
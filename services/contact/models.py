@@ -1,25 +1,41 @@
 """Contact service database models."""
 
-from sqlalchemy import String, Text, Boolean, Integer
+from sqlalchemy import String, Text, Boolean, Integer, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from shared.database import Base
 from typing import Optional
+from datetime import datetime
 
 
 class Contact(Base):
     """Contact model representing individual contacts in the CRM."""
     
     __tablename__ = "contacts"
+    __table_args__ = (
+        # Search and list ordering within a tenant; id breaks ties for paging
+        Index("ix_contacts_tenant_created_at", "tenant_id", "created_at", "id"),
+        Index("ix_contacts_tenant_updated_at", "tenant_id", "updated_at", "id"),
+        Index("ix_contacts_tenant_first_name", "tenant_id", "first_name", "id"),
+        # Recent contacts and contacts by company only ever list active rows
+        Index(
+            "ix_contacts_tenant_active_created_at", "tenant_id", "created_at",
+            postgresql_where=text("is_active")
+        ),
+        Index(
+            "ix_contacts_tenant_active_company", "tenant_id", "company", "first_name", "last_name",
+            postgresql_where=text("is_active")
+        ),
+    )
     
     # Basic Information
-    first_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    last_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    email: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True)
+    first_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    last_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    email: Mapped[Optional[str]] = mapped_column(String(255), unique=True)
     phone: Mapped[Optional[str]] = mapped_column(String(20))
     mobile: Mapped[Optional[str]] = mapped_column(String(20))
     
     # Professional Information
-    company: Mapped[Optional[str]] = mapped_column(String(200), index=True)
+    company: Mapped[Optional[str]] = mapped_column(String(200))
     title: Mapped[Optional[str]] = mapped_column(String(100))
     department: Mapped[Optional[str]] = mapped_column(String(100))
     
@@ -36,20 +52,30 @@ class Contact(Base):
     website: Mapped[Optional[str]] = mapped_column(String(500))
     
     # Status and Classification
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
-    lead_source: Mapped[Optional[str]] = mapped_column(String(100), index=True)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    lead_source: Mapped[Optional[str]] = mapped_column(String(100))
     
     # Notes and Additional Info
     notes: Mapped[Optional[str]] = mapped_column(Text)
     
     # Tenant isolation (for multi-tenancy)
-    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False)
     
     @property
     def full_name(self) -> str:
         """Get full name of the contact."""
         return f"{self.first_name} {self.last_name}".strip()
     
+    @classmethod
+    def from_dict(cls, data: dict) -> "Contact":
+        """Rebuild a (detached) contact from ``to_dict()`` output, e.g. a cache entry."""
+        columns = {column.key for column in cls.__table__.columns}
+        values = {key: value for key, value in data.items() if key in columns}
+        for key in ("created_at", "updated_at"):
+            if isinstance(values.get(key), str):
+                values[key] = datetime.fromisoformat(values[key])
+        return cls(**values)
+    
     def to_dict(self) -> dict:
         """Convert model to dictionary."""
         return {
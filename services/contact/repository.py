@@ -1,12 +1,30 @@
 """Contact service repository for database operations."""
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, text
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Tuple
+import hashlib
+import json
+import os
 from models import Contact
 from schemas import ContactCreate, ContactUpdate, ContactSearchQuery
 from shared.cache import CacheManager
+from shared.pagination import page_rows, paginate
+
+
+# Seconds an exact search total stays cached (writes invalidate it sooner)
+COUNT_CACHE_TTL = int(os.getenv("CONTACT_COUNT_CACHE_TTL", "60"))
+
+# Sort options: ORDER BY expression and the attribute it is read from.
+# Nullable columns are coalesced so keyset comparisons never meet NULL.
+SORT_FIELDS = {
+    "name": (Contact.first_name, "first_name"),
+    "company": (func.coalesce(Contact.company, ""), "company"),
+    "email": (func.coalesce(Contact.email, ""), "email"),
+    "updated_at": (Contact.updated_at, "updated_at"),
+    "created_at": (Contact.created_at, "created_at"),
+}
 
 
 class ContactRepository:
@@ -16,6 +34,10 @@ class ContactRepository:
         self.db = db
         self.cache = cache
     
+    async def release(self):
+        """Return the session's connection to the pool once reads are done."""
+        await self.db.close()
+    
     async def create(self, contact_data: ContactCreate) -> Contact:
         """Create a new contact."""
         contact = Contact(**contact_data.dict())
@@ -24,34 +46,66 @@ class ContactRepository:
         await self.db.refresh(contact)
         
         # Cache the new contact
-        await self.cache.set(f"contact:{contact.id}", contact.to_dict(), expire=300)
+        namespace = await self.cache.tenant_namespace(contact.tenant_id)
+        await self.cache.set(self.cache.namespaced_key(namespace, "contact", contact.id), contact.to_dict(), expire=300)
+        await self.invalidate_counts(contact.tenant_id, namespace)
         
         return contact
     
     async def get_by_id(self, contact_id: int, tenant_id: int) -> Optional[Contact]:
         """Get contact by ID and tenant ID."""
-        # Try cache first
-        cache_key = f"contact:{contact_id}"
-        cached_contact = await self.cache.get(cache_key)
+        async def load():
+            contact = await self._load(contact_id, tenant_id)
+            return contact.to_dict() if contact else None
         
-        if cached_contact and cached_contact.get("tenant_id") == tenant_id:
-            # Convert cached dict back to Contact object
-            return Contact(**cached_contact)
+        # Read through the tenant's cache; concurrent misses share one database query
+        cache_key = await self.cache.tenant_key(tenant_id, "contact", contact_id)
+        cached_contact = await self.cache.get_or_load(cache_key, load, expire=300)
         
-        # Query database
+        # Convert cached dict back to Contact object
+        return Contact.from_dict(cached_contact) if cached_contact else None
+    
+    async def _load(self, contact_id: int, tenant_id: int) -> Optional[Contact]:
+        """Load a contact from the database into the session (never from cache)."""
         result = await self.db.execute(
             select(Contact).where(
                 Contact.id == contact_id,
                 Contact.tenant_id == tenant_id
             )
         )
-        contact = result.scalar_one_or_none()
+        return result.scalar_one_or_none()
+    
+    async def get_by_ids(self, contact_ids: List[int], tenant_id: int) -> List[Contact]:
+        """Get several contacts, in ``contact_ids`` order, skipping unknown ids.
         
-        if contact:
-            # Cache the result
-            await self.cache.set(cache_key, contact.to_dict(), expire=300)
+        Cached entries are read in one round trip; the misses are loaded
+        with a single IN query and written back to the cache in one pipeline.
+        """
+        contact_ids = list(dict.fromkeys(contact_ids))
+        namespace = await self.cache.tenant_namespace(tenant_id)
+        cache_keys = {
+            contact_id: self.cache.namespaced_key(namespace, "contact", contact_id) for contact_id in contact_ids
+        }
+        cached = await self.cache.get_many(cache_keys.values())
         
-        return contact
+        contacts = {}
+        for contact_id, cache_key in cache_keys.items():
+            if cache_key in cached:
+                contacts[contact_id] = Contact.from_dict(cached[cache_key])
+        
+        misses = [contact_id for contact_id in contact_ids if contact_id not in contacts]
+        if misses:
+            result = await self.db.execute(
+                select(Contact).where(
+                    Contact.id.in_(misses),
+                    Contact.tenant_id == tenant_id
+                )
+            )
+            loaded = result.scalars().all()
+            contacts.update((contact.id, contact) for contact in loaded)
+            await self.cache.set_many({cache_keys[contact.id]: contact.to_dict() for contact in loaded}, expire=300)
+        
+        return [contacts[contact_id] for contact_id in contact_ids if contact_id in contacts]
     
     async def get_by_email(self, email: str, tenant_id: int) -> Optional[Contact]:
         """Get contact by email and tenant ID."""
@@ -65,7 +119,8 @@ class ContactRepository:
     
     async def update(self, contact_id: int, tenant_id: int, contact_data: ContactUpdate) -> Optional[Contact]:
         """Update an existing contact."""
-        contact = await self.get_by_id(contact_id, tenant_id)
+        # Writes need the session-bound row, not a detached cache copy
+        contact = await self._load(contact_id, tenant_id)
         if not contact:
             return None
         
@@ -78,14 +133,15 @@ class ContactRepository:
         await self.db.refresh(contact)
         
         # Update cache
-        cache_key = f"contact:{contact.id}"
-        await self.cache.set(cache_key, contact.to_dict(), expire=300)
+        namespace = await self.cache.tenant_namespace(tenant_id)
+        await self.cache.set(self.cache.namespaced_key(namespace, "contact", contact.id), contact.to_dict(), expire=300)
+        await self.invalidate_counts(tenant_id, namespace)
         
         return contact
     
     async def delete(self, contact_id: int, tenant_id: int) -> bool:
         """Delete a contact (soft delete by setting is_active=False)."""
-        contact = await self.get_by_id(contact_id, tenant_id)
+        contact = await self._load(contact_id, tenant_id)
         if not contact:
             return False
         
@@ -93,12 +149,21 @@ class ContactRepository:
         await self.db.commit()
         
         # Remove from cache
-        await self.cache.delete(f"contact:{contact.id}")
+        namespace = await self.cache.tenant_namespace(tenant_id)
+        await self.cache.delete(self.cache.namespaced_key(namespace, "contact", contact.id))
+        await self.invalidate_counts(tenant_id, namespace)
         
         return True
     
-    async def search(self, search_query: ContactSearchQuery, tenant_id: int) -> Tuple[List[Contact], int]:
-        """Search contacts with pagination."""
+    @staticmethod
+    def sort_key(search_query: ContactSearchQuery) -> str:
+        """Normalized sort a cursor is bound to, e.g. ``created_at:desc``."""
+        sort_by = search_query.sort_by if search_query.sort_by in SORT_FIELDS else "created_at"
+        return f"{sort_by}:{search_query.sort_order}"
+    
+    @classmethod
+    def build_search_query(cls, search_query: ContactSearchQuery, tenant_id: int):
+        """Filtered and sorted search statement, without pagination."""
         query = select(Contact).where(Contact.tenant_id == tenant_id)
         
         # Apply filters
@@ -122,37 +187,87 @@ class ContactRepository:
         if search_query.lead_source:
             query = query.where(Contact.lead_source == search_query.lead_source)
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # Apply sorting; id breaks ties so pages never overlap
+        sort_by, sort_order = cls.sort_key(search_query).split(":")
+        order_field = SORT_FIELDS[sort_by][0]
+        if sort_order == "desc":
+            return query.order_by(order_field.desc(), Contact.id.desc())
+        return query.order_by(order_field, Contact.id)
+    
+    async def invalidate_counts(self, tenant_id: int, namespace: Optional[str] = None):
+        """Bump the tenant's count version so cached search totals are recomputed."""
+        namespace = namespace or await self.cache.tenant_namespace(tenant_id)
+        await self.cache.incr(self.cache.namespaced_key(namespace, "contact_count", "version"))
+    
+    async def count(self, search_query: ContactSearchQuery, tenant_id: int) -> Tuple[Optional[int], str]:
+        """Search total and the mode that produced it.
         
-        # Apply sorting
-        if search_query.sort_by == "name":
-            order_field = Contact.first_name
-        elif search_query.sort_by == "company":
-            order_field = Contact.company
-        elif search_query.sort_by == "email":
-            order_field = Contact.email
-        elif search_query.sort_by == "updated_at":
-            order_field = Contact.updated_at
-        else:
-            order_field = Contact.created_at
+        ``none`` skips counting, ``estimate`` reads the planner's row
+        estimate (unfiltered lists on Postgres only, else falls back to
+        ``cached``), ``cached`` keeps exact counts per tenant and filter set
+        until the next write, and ``exact`` always runs count(*).
+        """
+        mode = search_query.total_mode
+        if mode == "none":
+            return None, "none"
         
-        if search_query.sort_order == "desc":
-            order_field = order_field.desc()
+        query = self.build_search_query(search_query, tenant_id).order_by(None)
+        if mode == "estimate":
+            unfiltered = not (search_query.query or search_query.company or search_query.lead_source)
+            if unfiltered and self.db.bind.dialect.name == "postgresql":
+                return await self._estimate_count(query), "estimate"
+            mode = "cached"
         
-        query = query.order_by(order_field)
+        if mode == "cached":
+            namespace = await self.cache.tenant_namespace(tenant_id)
+            version = await self.cache.get(self.cache.namespaced_key(namespace, "contact_count", "version")) or 0
+            filters = json.dumps(
+                [search_query.query, search_query.company, search_query.is_active, search_query.lead_source]
+            )
+            cache_key = self.cache.namespaced_key(
+                namespace, "contact_count", version, hashlib.sha1(filters.encode()).hexdigest()[:16]
+            )
+            total = await self.cache.get_or_load(cache_key, lambda: self._exact_count(query), expire=COUNT_CACHE_TTL)
+            return total, "cached"
         
-        # Apply pagination
-        offset = (search_query.page - 1) * search_query.page_size
-        query = query.offset(offset).limit(search_query.page_size)
+        return await self._exact_count(query), "exact"
+    
+    async def _exact_count(self, query) -> int:
+        result = await self.db.execute(select(func.count()).select_from(query.subquery()))
+        return result.scalar()
+    
+    async def _estimate_count(self, query) -> int:
+        # Only tenant and boolean filters reach here, so literal binds are safe
+        sql = query.compile(dialect=self.db.bind.dialect, compile_kwargs={"literal_binds": True})
+        result = await self.db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
+    async def search(self, search_query: ContactSearchQuery, tenant_id: int) -> Tuple[List[Contact], Optional[int], str, Optional[str]]:
+        """Search contacts with pagination.
         
-        # Execute query
+        With ``search_query.cursor`` the page starts right after the cursor
+        (keyset pagination, constant cost at any depth); otherwise
+        ``page`` is used as an offset. Returns the contacts, the total, the
+        total mode (see ``count``) and the cursor of the next page (None on
+        the last page).
+        """
+        query = self.build_search_query(search_query, tenant_id)
+        total, total_mode = await self.count(search_query, tenant_id)
+        
+        # Apply pagination
+        sort_key = self.sort_key(search_query)
+        sort_column, sort_attribute = SORT_FIELDS[sort_key.split(":")[0]]
+        query = paginate(
+            query, sort_key, sort_column, Contact.id,
+            search_query.cursor, search_query.page, search_query.page_size
+        )
         result = await self.db.execute(query)
-        contacts = result.scalars().all()
+        contacts, next_cursor = page_rows(result.scalars().all(), search_query.page_size, sort_key, sort_attribute)
         
-        return contacts, total
+        return contacts, total, total_mode, next_cursor
     
     async def get_by_company(self, company: str, tenant_id: int) -> List[Contact]:
         """Get all contacts for a specific company."""
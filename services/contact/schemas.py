@@ -99,11 +99,13 @@ class ContactList(BaseModel):
     """Schema for paginated contact list response."""
     
     contacts: list[ContactResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Matching contacts; None when total_mode is 'none'")
+    total_mode: str = Field("exact", description="How total was produced: exact, cached, estimate or none")
     page: int
     page_size: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, for keyset pagination")
 
 
 class ContactSearchQuery(BaseModel):
@@ -115,5 +117,7 @@ class ContactSearchQuery(BaseModel):
     lead_source: Optional[str] = Field(None, description="Filter by lead source")
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(20, ge=1, le=100, description="Page size")
+    cursor: Optional[str] = Field(None, description="Next-page cursor from a previous response; overrides page")
+    total_mode: str = Field("exact", pattern="^(exact|cached|estimate|none)$", description="How to compute total")
     sort_by: str = Field("created_at", description="Sort field")
     sort_order: str = Field("desc", pattern="^(asc|desc)$", description="Sort order")
\ No newline at end of file
@@ -34,6 +34,7 @@ class ContactService:
     async def get_contact(self, contact_id: int, tenant_id: int) -> ContactResponse:
         """Get a contact by ID."""
         contact = await self.repository.get_by_id(contact_id, tenant_id)
+        await self.repository.release()
         if not contact or not contact.is_active:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -76,33 +77,38 @@ class ContactService:
     
     async def search_contacts(self, search_query: ContactSearchQuery, tenant_id: int) -> ContactList:
         """Search contacts with pagination."""
-        contacts, total = await self.repository.search(search_query, tenant_id)
+        contacts, total, total_mode, next_cursor = await self.repository.search(search_query, tenant_id)
+        await self.repository.release()
         
         contact_responses = [ContactResponse(**contact.to_dict()) for contact in contacts]
         
-        has_next = (search_query.page * search_query.page_size) < total
-        has_prev = search_query.page > 1
+        has_prev = search_query.page > 1 or search_query.cursor is not None
         
         return ContactList(
             contacts=contact_responses,
             total=total,
+            total_mode=total_mode,
             page=search_query.page,
             page_size=search_query.page_size,
-            has_next=has_next,
-            has_prev=has_prev
+            has_next=next_cursor is not None,
+            has_prev=has_prev,
+            next_cursor=next_cursor
         )
     
     async def get_contacts_by_company(self, company: str, tenant_id: int) -> List[ContactResponse]:
         """Get all contacts for a specific company."""
         contacts = await self.repository.get_by_company(company, tenant_id)
+        await self.repository.release()
         return [ContactResponse(**contact.to_dict()) for contact in contacts]
     
     async def get_recent_contacts(self, tenant_id: int, limit: int = 10) -> List[ContactResponse]:
         """Get recently created contacts."""
         contacts = await self.repository.get_recent(tenant_id, limit)
+        await self.repository.release()
         return [ContactResponse(**contact.to_dict()) for contact in contacts]
     
     async def validate_contact_exists(self, contact_id: int, tenant_id: int) -> bool:
         """Validate that a contact exists and is active."""
         contact = await self.repository.get_by_id(contact_id, tenant_id)
+        await self.repository.release()
         return contact is not None and contact.is_active
\ No newline at end of file
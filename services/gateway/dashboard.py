@@ -0,0 +1,84 @@
+"""Dashboard aggregation across backend services."""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from upstreams import Upstream
+
+
+class DashboardSection:
+    """One dashboard section backed by a single upstream endpoint."""
+
+    def __init__(self, name: str, upstream: Upstream, path: str, transform: Optional[Callable] = None):
+        self.name = name
+        self.upstream = upstream
+        self.path = path
+        self.transform = transform or (lambda data: data)
+
+
+class DashboardAggregator:
+    """Fan-out dashboard builder with per-section deadlines.
+
+    All sections are queried concurrently. A section that misses its
+    deadline or fails is reported with its own status instead of failing
+    the whole dashboard. Snapshots are cached per tenant for ``ttl``
+    seconds, and concurrent requests for the same tenant share one build.
+    """
+
+    def __init__(self, sections: List[DashboardSection], deadline: float = 2.0, ttl: float = 10.0):
+        self.sections = sections
+        self.deadline = deadline
+        self.ttl = ttl
+        self._snapshots: Dict[str, Tuple[float, dict]] = {}
+        self._builds: Dict[str, asyncio.Task] = {}
+
+    async def summary(self, tenant_id, headers: List[Tuple[str, str]]) -> dict:
+        """Return the tenant's dashboard, from the snapshot cache if fresh."""
+        tenant_key = str(tenant_id)
+        snapshot = self._snapshots.get(tenant_key)
+        if snapshot and snapshot[0] > time.monotonic():
+            return {**snapshot[1], "cached": True}
+
+        build = self._builds.get(tenant_key)
+        if build is None:
+            build = asyncio.ensure_future(self._build(tenant_key, headers))
+            self._builds[tenant_key] = build
+            build.add_done_callback(lambda _: self._builds.pop(tenant_key, None))
+
+        # Shield the shared build from cancellation by any single caller
+        return {**await asyncio.shield(build), "cached": False}
+
+    async def _build(self, tenant_key: str, headers: List[Tuple[str, str]]) -> dict:
+        results = await asyncio.gather(*[
+            self._fetch_section(section, headers) for section in self.sections
+        ])
+        summary = {section.name: result for section, result in zip(self.sections, results)}
+        summary["timestamp"] = time.time()
+
+        if any(result["status"] == "ok" for result in results):
+            now = time.monotonic()
+            self._snapshots = {
+                key: value for key, value in self._snapshots.items() if value[0] > now
+            }
+            self._snapshots[tenant_key] = (now + self.ttl, summary)
+        return summary
+
+    async def _fetch_section(self, section: DashboardSection, headers: List[Tuple[str, str]]) -> dict:
+        try:
+            response = await asyncio.wait_for(
+                section.upstream.request("GET", section.path, headers=headers),
+                timeout=self.deadline
+            )
+        except asyncio.TimeoutError:
+            return {"status": "timeout"}
+        except Exception:
+            return {"status": "unavailable"}
+
+        if response.status_code != 200:
+            return {"status": "error", "status_code": response.status_code}
+        try:
+            return {"status": "ok", **section.transform(response.json())}
+        except Exception:
+            # A 200 with a body the section cannot read degrades like any other failure
+            return {"status": "error"}
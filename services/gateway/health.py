@@ -0,0 +1,132 @@
+"""Background health probing of gateway upstreams."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from upstreams import Replica, Upstream
+
+
+class ReplicaHealth:
+    """Rolling health state of one replica."""
+
+    def __init__(self, window: int = 50):
+        self.status = "unknown"
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=window)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self) -> dict:
+        return {
+            "status": self.status,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+            "latency_ms": {
+                "p50": self.percentile(0.50),
+                "p95": self.percentile(0.95),
+                "p99": self.percentile(0.99),
+            },
+        }
+
+
+class HealthProber:
+    """Probes every replica of every upstream concurrently on an interval.
+
+    Results are kept in memory, so health endpoints answer instantly. A
+    replica that fails ``unhealthy_after`` probes in a row is marked
+    unhealthy and skipped by upstream selection until a probe succeeds.
+    """
+
+    def __init__(
+        self,
+        upstreams: List[Upstream],
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        unhealthy_after: int = 2,
+        path: str = "/health",
+    ):
+        self.upstreams = upstreams
+        self.interval = interval
+        self.timeout = timeout
+        self.unhealthy_after = unhealthy_after
+        self.path = path
+        self._task: Optional[asyncio.Task] = None
+        self.health: Dict[Replica, ReplicaHealth] = {
+            replica: ReplicaHealth()
+            for upstream in upstreams
+            for replica in upstream.replicas
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.interval)
+
+    async def probe_all(self):
+        await asyncio.gather(*[
+            self._probe(upstream, replica)
+            for upstream in self.upstreams
+            for replica in upstream.replicas
+        ])
+
+    async def _probe(self, upstream: Upstream, replica: Replica):
+        health = self.health[replica]
+        started = time.perf_counter()
+        try:
+            # Probes go straight to the replica, bypassing breaker and retries
+            response = await upstream.client.get(f"{replica.url}{self.path}", timeout=self.timeout)
+            error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+
+        health.last_checked = time.time()
+        health.last_error = error
+        if error is None:
+            health.latencies.append(round((time.perf_counter() - started) * 1000, 2))
+            health.consecutive_failures = 0
+            health.status = "healthy"
+            replica.healthy = True
+        else:
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.unhealthy_after:
+                health.status = "unhealthy" if error.startswith("HTTP") else "unreachable"
+                replica.healthy = False
+
+    def upstream_status(self, upstream: Upstream) -> str:
+        statuses = [self.health[replica].status for replica in upstream.replicas]
+        if "healthy" in statuses:
+            return "healthy"
+        if "unknown" in statuses:
+            return "unknown"
+        if "unhealthy" in statuses:
+            return "unhealthy"
+        return "unreachable"
+
+    def stats(self, upstream: Upstream) -> dict:
+        return {
+            "status": self.upstream_status(upstream),
+            "replicas": {
+                replica.url: self.health[replica].stats() for replica in upstream.replicas
+            },
+        }
@@ -2,24 +2,80 @@
 
 from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
 import os
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 import time
-from collections import defaultdict
 import asyncio
+import json
+from urllib.parse import unquote, urlsplit
 
-from shared.auth import get_current_user, create_access_token
-
-# Service URLs
-CONTACT_SERVICE_URL = os.getenv("CONTACT_SERVICE_URL", "http://localhost:8001")
-LEAD_SERVICE_URL = os.getenv("LEAD_SERVICE_URL", "http://localhost:8002")
-OPPORTUNITY_SERVICE_URL = os.getenv("OPPORTUNITY_SERVICE_URL", "http://localhost:8003")
-ACTIVITY_SERVICE_URL = os.getenv("ACTIVITY_SERVICE_URL", "http://localhost:8004")
+from shared.auth import (
+    get_bearer_user, create_access_token, create_identity_header,
+    get_password_hash_async, verify_password_async, password_hash_pool,
+    INTERNAL_IDENTITY_HEADER, INTERNAL_IDENTITY_SECRET
+)
+from shared.cache import CacheManager
+from rate_limit import SlidingWindowCounter, RedisSlidingWindowCounter
+from upstreams import IDEMPOTENT_METHODS, Upstream
+from resilience import CircuitOpenError
+from coalescing import SingleFlight
+from health import HealthProber
+from dashboard import DashboardAggregator, DashboardSection
+from schemas import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+from response_cache import CachedResponse, ResponseCache, etag_matches, parse_route_ttls
+
+# Upstream services, each with its own connection pool
+contact_service = Upstream.from_env("contact-service", "CONTACT_SERVICE", "http://localhost:8001")
+lead_service = Upstream.from_env("lead-service", "LEAD_SERVICE", "http://localhost:8002")
+opportunity_service = Upstream.from_env("opportunity-service", "OPPORTUNITY_SERVICE", "http://localhost:8003")
+activity_service = Upstream.from_env("activity-service", "ACTIVITY_SERVICE", "http://localhost:8004")
+upstreams = [contact_service, lead_service, opportunity_service, activity_service]
+
+# Background health probing of every upstream replica
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+HEALTH_UNHEALTHY_AFTER = int(os.getenv("HEALTH_UNHEALTHY_AFTER", "2"))
+health_prober = HealthProber(
+    upstreams,
+    interval=HEALTH_PROBE_INTERVAL,
+    timeout=HEALTH_PROBE_TIMEOUT,
+    unhealthy_after=HEALTH_UNHEALTHY_AFTER
+)
 
-# Rate limiting storage
-rate_limit_storage = defaultdict(list)
+# Rate limiting configuration ("memory" is per process, "redis" is shared)
+RATE_LIMIT_CALLS = int(os.getenv("RATE_LIMIT_CALLS", "1000"))
+RATE_LIMIT_PERIOD = int(os.getenv("RATE_LIMIT_PERIOD", "3600"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Opt-in GET response cache, e.g. "/api/v1/contacts=15,/api/v1/leads=15"
+RESPONSE_CACHE_ROUTES = os.getenv("RESPONSE_CACHE_ROUTES", "")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Share one upstream call between identical concurrent GETs of a tenant.
+# Coalesced GETs are buffered instead of streamed.
+REQUEST_COALESCING = os.getenv("REQUEST_COALESCING", "false").lower() in ("1", "true", "yes", "on")
+
+# Batch endpoint limits
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+# Dashboard fan-out: per-service deadline and per-tenant snapshot TTL (seconds)
+DASHBOARD_DEADLINE = float(os.getenv("DASHBOARD_DEADLINE", "2.0"))
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "10"))
+
+# Initialize cache
+cache_manager = CacheManager()
+single_flight = SingleFlight()
+response_cache = ResponseCache(
+    parse_route_ttls(RESPONSE_CACHE_ROUTES),
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=RESPONSE_CACHE_MAX_BYTES
+)
 
 # Create FastAPI app
 app = FastAPI(
@@ -42,46 +98,59 @@ app.add_middleware(
 
 # Rate limiting middleware
 class RateLimitMiddleware:
-    def __init__(self, calls: int = 100, period: int = 60):
+    def __init__(self, calls: int = 100, period: int = 60, backend: str = "memory"):
         self.calls = calls
         self.period = period
+        self.local = SlidingWindowCounter(calls, period, max_keys=RATE_LIMIT_MAX_KEYS)
+        self.shared = (
+            RedisSlidingWindowCounter(cache_manager, calls, period)
+            if backend == "redis" else None
+        )
     
     async def __call__(self, request: Request, call_next):
         client_ip = request.client.host
-        current_time = time.time()
         
-        # Clean old entries
-        rate_limit_storage[client_ip] = [
-            timestamp for timestamp in rate_limit_storage[client_ip]
-            if current_time - timestamp < self.period
-        ]
+        allowed = None
+        if self.shared:
+            try:
+                allowed = await self.shared.hit(client_ip)
+            except Exception:
+                # Redis unavailable: fall back to the per-process limit
+                allowed = None
+        if allowed is None:
+            allowed = self.local.hit(client_ip)
         
-        # Check rate limit
-        if len(rate_limit_storage[client_ip]) >= self.calls:
+        if not allowed:
             return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": "Rate limit exceeded"}
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(self.local.retry_after())}
             )
         
-        # Add current request
-        rate_limit_storage[client_ip].append(current_time)
-        
         response = await call_next(request)
         return response
 
 
 # Add rate limiting middleware
-app.middleware("http")(RateLimitMiddleware(calls=1000, period=3600))  # 1000 calls per hour
+app.middleware("http")(RateLimitMiddleware(
+    calls=RATE_LIMIT_CALLS, period=RATE_LIMIT_PERIOD, backend=RATE_LIMIT_BACKEND
+))
 
 
-# HTTP client for service communication
-http_client = httpx.AsyncClient(timeout=30.0)
+@app.on_event("startup")
+async def startup():
+    """Start background tasks on startup."""
+    health_prober.start()
+    DEMO_USERS["demo"]["password_hash"] = await get_password_hash_async("demo123")
 
 
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup on shutdown."""
-    await http_client.aclose()
+    await health_prober.stop()
+    for upstream in upstreams:
+        await upstream.close()
+    await cache_manager.disconnect()
 
 
 # Health check endpoints
@@ -93,25 +162,15 @@ async def health_check():
 
 @app.get("/health/services")
 async def services_health_check():
-    """Check health of all services."""
-    services = {
-        "contact-service": f"{CONTACT_SERVICE_URL}/health",
-        "lead-service": f"{LEAD_SERVICE_URL}/health",
-        "opportunity-service": f"{OPPORTUNITY_SERVICE_URL}/health",
-        "activity-service": f"{ACTIVITY_SERVICE_URL}/health"
-    }
+    """Check health of all services.
     
-    health_status = {}
-    
-    for service_name, health_url in services.items():
-        try:
-            response = await http_client.get(health_url, timeout=5.0)
-            if response.status_code == 200:
-                health_status[service_name] = "healthy"
-            else:
-                health_status[service_name] = "unhealthy"
-        except Exception:
-            health_status[service_name] = "unreachable"
+    Served from the background prober's state; this endpoint never calls
+    the services itself.
+    """
+    health_status = {
+        upstream.name: health_prober.upstream_status(upstream)
+        for upstream in upstreams
+    }
     
     overall_status = "healthy" if all(
         status == "healthy" for status in health_status.values()
@@ -120,20 +179,72 @@ async def services_health_check():
     return {
         "status": overall_status,
         "services": health_status,
+        "details": {
+            upstream.name: health_prober.stats(upstream) for upstream in upstreams
+        },
+        "timestamp": time.time()
+    }
+
+
+@app.get("/metrics/response-cache")
+async def response_cache_metrics():
+    """Gateway response cache statistics."""
+    return {
+        "enabled": response_cache.enabled,
+        "routes": response_cache.route_ttls,
+        **response_cache.stats(),
+        "timestamp": time.time()
+    }
+
+
+@app.get("/metrics/coalescing")
+async def coalescing_metrics():
+    """How many GETs were served by sharing another request's upstream call."""
+    return {
+        "enabled": REQUEST_COALESCING,
+        **single_flight.stats(),
+        "timestamp": time.time()
+    }
+
+
+@app.get("/metrics/upstreams")
+async def upstream_metrics():
+    """Live connection pool statistics for every upstream service."""
+    return {
+        "upstreams": {
+            upstream.name: {
+                "strategy": upstream.strategy,
+                "replicas": upstream.replica_stats(),
+                "pool": upstream.pool_stats(),
+                **upstream.resilience_stats()
+            }
+            for upstream in upstreams
+        },
         "timestamp": time.time()
     }
 
 
 # Authentication endpoints
+# Demo user store; in production, validate against user database
+DEMO_USERS = {
+    "demo": {"user_id": "1", "tenant_id": 1, "password_hash": None},
+}
+
+
 @app.post("/auth/token")
 async def login(username: str, password: str):
-    """Simple authentication endpoint (demo purposes)."""
-    # In production, validate against user database
-    if username == "demo" and password == "demo123":
+    """Simple authentication endpoint (demo purposes).
+    
+    bcrypt verification runs in the shared password hashing pool, so logins
+    do not stall proxied requests; bursts beyond the pool's admission limit
+    get a 503.
+    """
+    user = DEMO_USERS.get(username)
+    if user and user["password_hash"] and await verify_password_async(password, user["password_hash"]):
         token_data = {
-            "sub": "1", 
+            "sub": user["user_id"], 
             "username": username,
-            "tenant_id": 1
+            "tenant_id": user["tenant_id"]
         }
         access_token = create_access_token(data=token_data)
         return {"access_token": access_token, "token_type": "bearer"}
@@ -144,65 +255,283 @@ async def login(username: str, password: str):
     )
 
 
+@app.get("/metrics/auth")
+async def auth_metrics():
+    """Password hashing pool usage."""
+    return {"password_hash_pool": password_hash_pool.stats(), "timestamp": time.time()}
+
+
+# Hop-by-hop headers (RFC 7230, section 6.1) apply to a single connection
+# and must not be forwarded by a proxy
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+})
+
+
+def strip_hop_by_hop_headers(headers: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Return the end-to-end subset of a list of (name, value) header pairs.
+    
+    Besides the fixed hop-by-hop set, any header named in the ``Connection``
+    header is dropped as well. Repeated headers (e.g. ``set-cookie``) are kept.
+    """
+    headers = list(headers)
+    connection_tokens = {
+        token.strip().lower()
+        for name, value in headers
+        if name.lower() == "connection"
+        for token in value.split(",")
+    }
+    return [
+        (name, value)
+        for name, value in headers
+        if name.lower() not in HOP_BY_HOP_HEADERS
+        and name.lower() not in connection_tokens
+    ]
+
+
+def upstream_headers(request: Request, current_user: Optional[dict]) -> List[Tuple[str, str]]:
+    """Headers to forward upstream, with the caller's identity attached."""
+    # host is set by the client for the upstream URL
+    headers = [
+        (name, value) for name, value in strip_hop_by_hop_headers(request.headers.items())
+        if name.lower() not in ("host", "x-user-id", "x-tenant-id", INTERNAL_IDENTITY_HEADER.lower())
+    ]
+    if current_user:
+        headers.extend(identity_headers(current_user))
+    return headers
+
+
+def identity_headers(current_user: dict) -> List[Tuple[str, str]]:
+    """Identity headers for a verified user, signed when internal trust is on."""
+    headers = [
+        ("X-User-ID", str(current_user["user_id"])),
+        ("X-Tenant-ID", str(current_user["payload"].get("tenant_id", 1))),
+    ]
+    if INTERNAL_IDENTITY_SECRET:
+        headers.append((INTERNAL_IDENTITY_HEADER, create_identity_header(current_user)))
+    return headers
+
+
+def upstream_error(exc: Exception) -> HTTPException:
+    """Map an exception raised while calling an upstream to a gateway error."""
+    if isinstance(exc, CircuitOpenError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service unavailable",
+            headers={"Retry-After": str(int(exc.retry_after))}
+        )
+    if isinstance(exc, httpx.TimeoutException):
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Service request timeout"
+        )
+    if isinstance(exc, httpx.ConnectError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service unavailable"
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Internal server error: {str(exc)}"
+    )
+
+
+def has_dot_segments(path: str) -> bool:
+    """Whether a path has ``.``/``..`` segments (plain or percent-encoded).
+    
+    HTTP clients collapse them before sending, so a path that passes a
+    prefix check could still reach any backend route.
+    """
+    decoded = unquote(path)
+    return "%2e" in decoded.lower() or any(segment in (".", "..") for segment in decoded.split("/"))
+
+
 # Proxy helper function
 async def proxy_request(
     request: Request,
-    service_url: str,
+    upstream: Upstream,
     path: str,
     current_user: Optional[dict] = None
 ):
-    """Proxy request to backend service."""
-    # Prepare headers
-    headers = dict(request.headers)
-    if current_user:
-        headers["X-User-ID"] = str(current_user["user_id"])
-        headers["X-Tenant-ID"] = str(current_user["payload"].get("tenant_id", 1))
+    """Proxy request to backend service.
+    
+    GETs on routes configured in ``RESPONSE_CACHE_ROUTES`` are answered from
+    the response cache. With ``REQUEST_COALESCING`` enabled, identical
+    concurrent GETs of a tenant share one upstream call. Everything else is
+    streamed through. A successful write drops the tenant's cached
+    responses for the route it touched.
+    """
+    if has_dot_segments(path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid path"
+        )
+    
+    route = response_cache.route_for(request.url.path) if current_user else None
     
-    # Remove host header to avoid conflicts
-    headers.pop("host", None)
+    if route and request.method == "GET":
+        return await cached_proxy_request(request, upstream, path, current_user, route)
+    
+    if REQUEST_COALESCING and current_user and request.method == "GET":
+        entry = await fetch_buffered_get(request, upstream, path, current_user)
+        return buffered_response(entry, request.headers.get("if-none-match"), {})
+    
+    response = await stream_proxy_request(request, upstream, path, current_user)
+    
+    if route and response.status_code < 400:
+        response_cache.invalidate(current_user["payload"].get("tenant_id", 1), route)
+    return response
+
+
+async def stream_proxy_request(
+    request: Request,
+    upstream: Upstream,
+    path: str,
+    current_user: Optional[dict] = None
+):
+    """Stream a request to a backend service and its response back.
+    
+    Request and response bodies are passed through without being buffered
+    or parsed, so large pages and exports pass at the speed of the slower
+    side and in constant memory.
+    """
+    headers = upstream_headers(request, current_user)
     
     # Prepare URL
-    url = f"{service_url}{path}"
+    url = path
     if request.query_params:
         url += f"?{request.query_params}"
     
+    # Stream the request body straight from the client, except for
+    # idempotent methods whose body is kept so the request can be retried
+    body = None
+    if request.method in IDEMPOTENT_METHODS:
+        body = await request.body() or None
+    elif request.method in ["POST", "PATCH"]:
+        body = request.stream()
+    
     try:
-        # Prepare request body
-        body = None
-        if request.method in ["POST", "PUT", "PATCH"]:
-            body = await request.body()
-        
-        # Make request to service
-        response = await http_client.request(
-            method=request.method,
-            url=url,
-            headers=headers,
-            content=body,
-            timeout=30.0
+        response, replica = await upstream.send(
+            request.method, url, headers=headers, content=body, stream=True
         )
+    except Exception as e:
+        raise upstream_error(e)
+    
+    # Pass the raw (still encoded) bytes through; the upstream connection is
+    # released once the body has been sent or the client goes away
+    proxied = StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        background=BackgroundTask(upstream.release, response, replica)
+    )
+    proxied.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1"))
+        for name, value in strip_hop_by_hop_headers(response.headers.multi_items())
+    ]
+    return proxied
+
+
+async def fetch_buffered_get(
+    request: Request,
+    upstream: Upstream,
+    path: str,
+    current_user: Optional[dict],
+    ttl: float = 0.0
+) -> CachedResponse:
+    """Fetch a GET into memory, sharing the upstream call between identical
+    concurrent requests of a tenant when coalescing is enabled."""
+    async def fetch() -> CachedResponse:
+        # The body is decoded and shared, so compression and conditionals
+        # are negotiated per client rather than forwarded
+        headers = [
+            (name, value) for name, value in upstream_headers(request, current_user)
+            if name.lower() not in ("accept-encoding", "if-none-match", "if-modified-since")
+        ]
+        url = f"{path}?{request.query_params}" if request.query_params else path
+        try:
+            response = await upstream.request("GET", url, headers=headers)
+        except Exception as e:
+            raise upstream_error(e)
         
-        # Return response
-        return JSONResponse(
-            content=response.json() if response.content else None,
+        return CachedResponse(
             status_code=response.status_code,
-            headers=dict(response.headers)
-        )
-        
-    except httpx.TimeoutException:
-        raise HTTPException(
-            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            detail="Service request timeout"
+            headers=[
+                (name, value)
+                for name, value in strip_hop_by_hop_headers(response.headers.multi_items())
+                if name.lower() not in ("content-length", "content-encoding", "etag")
+            ],
+            body=response.content,
+            ttl=ttl
         )
-    except httpx.ConnectError:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Service unavailable"
+    
+    if not (REQUEST_COALESCING and current_user):
+        return await fetch()
+    
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    key = ResponseCache.make_key(tenant_id, request.url.path, request.query_params.multi_items())
+    return await single_flight.do(key, fetch)
+
+
+def buffered_response(entry: CachedResponse, if_none_match: Optional[str], extra_headers: dict) -> Response:
+    """Build the client response for a buffered GET, honouring If-None-Match."""
+    if entry.status_code == 200 and etag_matches(if_none_match, entry.etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": entry.etag, **extra_headers}
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}"
+    
+    response = Response(content=entry.body, status_code=entry.status_code)
+    response.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1"))
+        for name, value in entry.headers
+    ] + response.raw_headers
+    if entry.status_code == 200:
+        response.headers["ETag"] = entry.etag
+    for name, value in extra_headers.items():
+        response.headers[name] = value
+    return response
+
+
+async def cached_proxy_request(
+    request: Request,
+    upstream: Upstream,
+    path: str,
+    current_user: dict,
+    route: str
+):
+    """Serve a GET from the response cache, filling it on a miss.
+    
+    Clients whose ``If-None-Match`` matches the cached ETag get a 304
+    without the backend being called.
+    """
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    key = ResponseCache.make_key(tenant_id, request.url.path, request.query_params.multi_items())
+    if_none_match = request.headers.get("if-none-match")
+    
+    entry = None
+    if "no-cache" not in request.headers.get("cache-control", ""):
+        entry = response_cache.get(key)
+    
+    cache_status = "HIT"
+    if entry is None:
+        cache_status = "MISS"
+        entry = await fetch_buffered_get(
+            request, upstream, path, current_user, ttl=response_cache.route_ttls[route]
         )
+        if entry.status_code == 200 and "no-store" not in dict(entry.headers).get("cache-control", ""):
+            response_cache.set(key, entry)
+    
+    if entry.status_code == 200 and etag_matches(if_none_match, entry.etag):
+        response_cache.not_modified += 1
+    return buffered_response(entry, if_none_match, {"X-Cache": cache_status})
 
 
 # Contact service routes
@@ -210,22 +539,22 @@ async def proxy_request(
 async def contact_proxy(
     request: Request,
     path: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to contact service."""
     return await proxy_request(
-        request, CONTACT_SERVICE_URL, f"/contacts/{path}", current_user
+        request, contact_service, f"/contacts/{path}", current_user
     )
 
 
 @app.api_route("/api/v1/contacts", methods=["GET", "POST"])
 async def contact_base_proxy(
     request: Request,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to contact service base endpoint."""
     return await proxy_request(
-        request, CONTACT_SERVICE_URL, "/contacts", current_user
+        request, contact_service, "/contacts", current_user
     )
 
 
@@ -234,22 +563,22 @@ async def contact_base_proxy(
 async def lead_proxy(
     request: Request,
     path: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to lead service."""
     return await proxy_request(
-        request, LEAD_SERVICE_URL, f"/leads/{path}", current_user
+        request, lead_service, f"/leads/{path}", current_user
     )
 
 
 @app.api_route("/api/v1/leads", methods=["GET", "POST"])
 async def lead_base_proxy(
     request: Request,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to lead service base endpoint."""
     return await proxy_request(
-        request, LEAD_SERVICE_URL, "/leads", current_user
+        request, lead_service, "/leads", current_user
     )
 
 
@@ -258,22 +587,22 @@ async def lead_base_proxy(
 async def opportunity_proxy(
     request: Request,
     path: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to opportunity service."""
     return await proxy_request(
-        request, OPPORTUNITY_SERVICE_URL, f"/opportunities/{path}", current_user
+        request, opportunity_service, f"/opportunities/{path}", current_user
     )
 
 
 @app.api_route("/api/v1/opportunities", methods=["GET", "POST"])
 async def opportunity_base_proxy(
     request: Request,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to opportunity service base endpoint."""
     return await proxy_request(
-        request, OPPORTUNITY_SERVICE_URL, "/opportunities", current_user
+        request, opportunity_service, "/opportunities", current_user
     )
 
 
@@ -282,57 +611,184 @@ async def opportunity_base_proxy(
 async def activity_proxy(
     request: Request,
     path: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to activity service."""
     return await proxy_request(
-        request, ACTIVITY_SERVICE_URL, f"/activities/{path}", current_user
+        request, activity_service, f"/activities/{path}", current_user
     )
 
 
 @app.api_route("/api/v1/activities", methods=["GET", "POST"])
 async def activity_base_proxy(
     request: Request,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_bearer_user)
 ):
     """Proxy requests to activity service base endpoint."""
     return await proxy_request(
-        request, ACTIVITY_SERVICE_URL, "/activities", current_user
+        request, activity_service, "/activities", current_user
     )
 
 
+# Batch endpoint
+# Gateway path prefix -> (upstream, backend path prefix)
+ROUTES = {
+    "/api/v1/contacts": (contact_service, "/contacts"),
+    "/api/v1/leads": (lead_service, "/leads"),
+    "/api/v1/opportunities": (opportunity_service, "/opportunities"),
+    "/api/v1/activities": (activity_service, "/activities"),
+}
+
+
+def resolve_route(path: str) -> Optional[Tuple[Upstream, str]]:
+    """Map a gateway path to its upstream and backend path."""
+    if has_dot_segments(path):
+        return None
+    for prefix, (upstream, backend_prefix) in ROUTES.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            return upstream, backend_prefix + path[len(prefix):]
+    return None
+
+
+def build_sub_request(request: Request, sub: BatchSubRequest) -> Request:
+    """Build a request for one batch entry, carrying the batch's credentials."""
+    split = urlsplit(sub.path)
+    body = b"" if sub.body is None else json.dumps(sub.body).encode()
+    
+    headers = {name.lower(): value for name, value in sub.headers.items()}
+    headers["authorization"] = request.headers.get("authorization", "")
+    # Bodies are embedded in the batch response, so they must arrive decoded
+    headers["accept-encoding"] = "identity"
+    if body:
+        headers["content-type"] = "application/json"
+        headers["content-length"] = str(len(body))
+    
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": sub.method,
+        "scheme": request.url.scheme,
+        "path": split.path,
+        "raw_path": split.path.encode(),
+        "query_string": split.query.encode(),
+        "root_path": "",
+        "headers": [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ],
+        "client": request.client,
+        "server": request.scope.get("server"),
+    }
+    
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+    
+    return Request(scope, receive)
+
+
+async def run_sub_request(request: Request, sub: BatchSubRequest, current_user: dict) -> BatchSubResponse:
+    """Dispatch one batch entry through the regular proxy path."""
+    sub_request = build_sub_request(request, sub)
+    route = resolve_route(sub_request.url.path)
+    if route is None:
+        return BatchSubResponse(status=status.HTTP_404_NOT_FOUND, headers={}, body={"detail": "Not Found"})
+    upstream, backend_path = route
+    
+    try:
+        response = await proxy_request(sub_request, upstream, backend_path, current_user)
+    except HTTPException as e:
+        return BatchSubResponse(status=e.status_code, headers={}, body={"detail": e.detail})
+    
+    # Run the response as an ASGI app to collect its body and background tasks
+    started = {}
+    chunks = []
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+    
+    async def wait_for_disconnect():
+        await asyncio.Event().wait()
+    
+    await response(sub_request.scope, wait_for_disconnect, send)
+    
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in started.get("headers", [])
+    }
+    content = b"".join(chunks)
+    body = content.decode("utf-8", errors="replace") if content else None
+    if content and "json" in headers.get("content-type", ""):
+        try:
+            body = json.loads(content)
+        except ValueError:
+            # Malformed JSON stays as text so one bad sub-response cannot fail the batch
+            pass
+    return BatchSubResponse(status=started.get("status", 502), headers=headers, body=body)
+
+
+@app.post("/api/v1/batch", response_model=BatchResponse)
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    current_user: dict = Depends(get_bearer_user)
+):
+    """Run several API calls in one round trip.
+    
+    The batch is authenticated and rate limited once. Sub-requests go
+    through the same routing, caching and coalescing as individual calls,
+    at most ``BATCH_MAX_CONCURRENCY`` at a time, and results are returned
+    in request order.
+    """
+    if len(batch_request.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {BATCH_MAX_REQUESTS} requests"
+        )
+    
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    
+    async def run(sub: BatchSubRequest) -> BatchSubResponse:
+        async with semaphore:
+            return await run_sub_request(request, sub, current_user)
+    
+    responses = await asyncio.gather(*[run(sub) for sub in batch_request.requests])
+    return BatchResponse(responses=responses)
+
+
 # Dashboard and analytics endpoints
+dashboard = DashboardAggregator(
+    sections=[
+        DashboardSection(
+            "contacts", contact_service, "/contacts/recent?limit=5",
+            lambda recent: {"recent": recent}
+        ),
+        DashboardSection("leads", lead_service, "/leads/summary"),
+        DashboardSection("opportunities", opportunity_service, "/opportunities/summary"),
+        DashboardSection("activities", activity_service, "/activities/summary"),
+    ],
+    deadline=DASHBOARD_DEADLINE,
+    ttl=DASHBOARD_CACHE_TTL
+)
+
+
 @app.get("/api/v1/dashboard/summary")
-async def dashboard_summary(current_user: dict = Depends(get_current_user)):
-    """Get dashboard summary from all services."""
-    tenant_id = current_user["payload"].get("tenant_id", 1)
+async def dashboard_summary(
+    request: Request,
+    current_user: dict = Depends(get_bearer_user)
+):
+    """Get dashboard summary from all services.
     
-    # Make parallel requests to all services for summary data
-    tasks = [
-        http_client.get(f"{CONTACT_SERVICE_URL}/contacts/recent?limit=5", 
-                       headers={"Authorization": f"Bearer {current_user}"}),
-        http_client.get(f"{LEAD_SERVICE_URL}/health"),  # Placeholder for leads summary
-        http_client.get(f"{OPPORTUNITY_SERVICE_URL}/health"),  # Placeholder for opportunities summary
-        http_client.get(f"{ACTIVITY_SERVICE_URL}/health"),  # Placeholder for activities summary
-    ]
+    Sections that are slow or failing come back with their own status
+    (``timeout``, ``unavailable`` or ``error``) alongside the others.
+    """
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    headers = [("Authorization", request.headers["authorization"])]
+    headers.extend(identity_headers(current_user))
     
-    try:
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        return {
-            "contacts": {"status": "ok", "recent": []},
-            "leads": {"status": "ok", "count": 0},
-            "opportunities": {"status": "ok", "count": 0, "total_value": 0},
-            "activities": {"status": "ok", "overdue": 0, "due_today": 0},
-            "timestamp": time.time()
-        }
-        
-    except Exception as e:
-        return {
-            "error": "Failed to fetch dashboard data",
-            "detail": str(e),
-            "timestamp": time.time()
-        }
+    return await dashboard.summary(tenant_id, headers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+"""Rate limiting for the API gateway."""
+
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from shared.cache import CacheManager
+
+
+class SlidingWindowCounter:
+    """In-process sliding-window-counter rate limiter.
+
+    Each key keeps the request count of the current and the previous fixed
+    window. The previous count is weighted by how much of it still overlaps
+    the sliding window, so a check is O(1) and memory per key is constant.
+    Keys idle for two periods are evicted, and at most ``max_keys`` keys are
+    tracked at once (least recently seen first out).
+    """
+
+    def __init__(self, calls: int, period: int, max_keys: int = 100_000):
+        self.calls = calls
+        self.period = period
+        self.max_keys = max_keys
+        # key -> [window index, current count, previous count, last seen]
+        self._windows: "OrderedDict[str, list]" = OrderedDict()
+
+    def hit(self, key: str, now: Optional[float] = None) -> bool:
+        """Record a request for ``key`` and return whether it is allowed."""
+        now = time.time() if now is None else now
+        window = int(now // self.period)
+
+        entry = self._windows.get(key)
+        if entry is None:
+            entry = [window, 0, 0, now]
+            self._windows[key] = entry
+        else:
+            self._windows.move_to_end(key)
+            if entry[0] != window:
+                entry[2] = entry[1] if entry[0] == window - 1 else 0
+                entry[1] = 0
+                entry[0] = window
+            entry[3] = now
+
+        self._evict(now)
+
+        overlap = 1.0 - (now % self.period) / self.period
+        if entry[2] * overlap + entry[1] >= self.calls:
+            return False
+
+        entry[1] += 1
+        return True
+
+    def retry_after(self, now: Optional[float] = None) -> int:
+        """Seconds until the current fixed window rolls over."""
+        now = time.time() if now is None else now
+        return max(1, int(self.period - (now % self.period)))
+
+    def _evict(self, now: float):
+        """Drop idle keys and enforce the key cap, oldest first."""
+        idle_before = now - 2 * self.period
+        while self._windows:
+            oldest_key, oldest = next(iter(self._windows.items()))
+            if oldest[3] >= idle_before and len(self._windows) <= self.max_keys:
+                break
+            del self._windows[oldest_key]
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+
+class RedisSlidingWindowCounter:
+    """Sliding-window-counter rate limiter shared through Redis.
+
+    Uses the same two-window estimate as ``SlidingWindowCounter`` but keeps
+    the counters in Redis, so the limit holds across gateway workers and
+    replicas. Each check is a single pipelined round trip; window keys
+    expire on their own after two periods.
+    """
+
+    def __init__(self, cache: CacheManager, calls: int, period: int, prefix: str = "ratelimit"):
+        self.cache = cache
+        self.calls = calls
+        self.period = period
+        self.prefix = prefix
+
+    async def hit(self, key: str, now: Optional[float] = None) -> bool:
+        """Record a request for ``key`` and return whether it is allowed."""
+        if not self.cache.redis_client:
+            await self.cache.connect()
+
+        now = time.time() if now is None else now
+        window = int(now // self.period)
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous_key = f"{self.prefix}:{key}:{window - 1}"
+
+        pipe = self.cache.redis_client.pipeline(transaction=False)
+        pipe.incr(current_key)
+        pipe.expire(current_key, 2 * self.period)
+        pipe.get(previous_key)
+        current, _, previous = await pipe.execute()
+
+        overlap = 1.0 - (now % self.period) / self.period
+        if int(previous or 0) * overlap + current - 1 >= self.calls:
+            # Rejected requests should not eat into the next window's budget
+            await self.cache.redis_client.decr(current_key)
+            return False
+        return True
@@ -0,0 +1,151 @@
+"""Circuit breaking and retry budgeting for gateway upstreams."""
+
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the upstream's circuit is open."""
+
+    def __init__(self, upstream_name: str, retry_after: float = 1.0):
+        super().__init__(f"Circuit open for {upstream_name}")
+        self.upstream_name = upstream_name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker with closed, open and half-open states.
+
+    Outcomes are counted in one-second buckets over a rolling ``window``.
+    Once at least ``min_requests`` were seen and the failure ratio reaches
+    ``failure_ratio`` the circuit opens and requests fail fast. After
+    ``open_duration`` seconds a single probe request is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_ratio: float = 0.5,
+        min_requests: int = 20,
+        window: int = 10,
+        open_duration: float = 30.0,
+    ):
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.open_duration = open_duration
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_started = None
+        # Each bucket is [second, successes, failures]
+        self._buckets = [[0, 0, 0] for _ in range(max(1, window))]
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now < self.opened_at + self.open_duration:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+
+        if self.state == self.HALF_OPEN:
+            # One probe at a time; a probe that never reported back is
+            # replaced after another open_duration
+            if self._probe_started is not None and now < self._probe_started + self.open_duration:
+                return False
+            self._probe_started = now
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        return max(1.0, self.opened_at + self.open_duration - time.monotonic())
+
+    def record_success(self):
+        if self.state == self.HALF_OPEN:
+            self._close()
+        self._bucket()[1] += 1
+
+    def record_failure(self):
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+
+        self._bucket()[2] += 1
+        if self.state == self.CLOSED:
+            successes, failures = self._totals()
+            total = successes + failures
+            if total >= self.min_requests and failures / total >= self.failure_ratio:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._probe_started = None
+
+    def _close(self):
+        self.state = self.CLOSED
+        self._probe_started = None
+        for bucket in self._buckets:
+            bucket[:] = [0, 0, 0]
+
+    def _bucket(self) -> list:
+        second = int(time.monotonic())
+        bucket = self._buckets[second % len(self._buckets)]
+        if bucket[0] != second:
+            bucket[:] = [second, 0, 0]
+        return bucket
+
+    def _totals(self):
+        oldest = int(time.monotonic()) - len(self._buckets)
+        live = [bucket for bucket in self._buckets if bucket[0] > oldest]
+        return sum(bucket[1] for bucket in live), sum(bucket[2] for bucket in live)
+
+    def stats(self) -> dict:
+        successes, failures = self._totals()
+        return {
+            "state": self.state,
+            "successes": successes,
+            "failures": failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class RetryBudget:
+    """Caps retries and hedges to a fraction of regular traffic.
+
+    Every request deposits ``ratio`` tokens and every retry or hedge
+    withdraws one, so retries can add at most ``ratio`` extra load on top
+    of the original requests. ``min_per_second`` tokens are added over
+    time so that low-traffic upstreams can still retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 5.0, max_balance: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance
+        self.balance = max_balance
+        self.rejected = 0
+        self._updated = time.monotonic()
+
+    def deposit(self):
+        self._refill()
+        self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one token for a retry; False if the budget is exhausted."""
+        self._refill()
+        if self.balance < 1.0:
+            self.rejected += 1
+            return False
+        self.balance -= 1.0
+        return True
+
+    def _refill(self):
+        now = time.monotonic()
+        self.balance = min(self.max_balance, self.balance + (now - self._updated) * self.min_per_second)
+        self._updated = now
@@ -0,0 +1,134 @@
+"""Response cache for idempotent GETs at the API gateway."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_route_ttls(spec: str) -> Dict[str, float]:
+    """Parse ``"/api/v1/contacts=15,/api/v1/leads=30"`` into a prefix -> TTL map."""
+    route_ttls = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        prefix, ttl = item.split("=", 1)
+        route_ttls[prefix.strip().rstrip("/")] = float(ttl)
+    return route_ttls
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against an ETag (RFC 7232)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+class CachedResponse:
+    """A buffered upstream response held by the cache."""
+
+    __slots__ = ("status_code", "headers", "body", "etag", "expires_at")
+
+    def __init__(self, status_code: int, headers: List[Tuple[str, str]], body: bytes, ttl: float):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.etag = make_etag(body)
+        self.expires_at = time.monotonic() + ttl
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+
+class ResponseCache:
+    """Bounded LRU cache of GET responses keyed by tenant, path and query.
+
+    Only routes listed in ``route_ttls`` are cached, each with its own TTL.
+    Memory is bounded by both an entry count and a total body size.
+    """
+
+    def __init__(self, route_ttls: Dict[str, float], max_entries: int = 1000, max_bytes: int = 50 * 1024 * 1024):
+        self.route_ttls = route_ttls
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.route_ttls)
+
+    def route_for(self, path: str) -> Optional[str]:
+        """Longest configured route prefix that covers ``path``."""
+        path = path.rstrip("/")
+        matches = [
+            prefix for prefix in self.route_ttls
+            if path == prefix or path.startswith(prefix + "/")
+        ]
+        return max(matches, key=len) if matches else None
+
+    @staticmethod
+    def make_key(tenant_id, path: str, query_items: List[Tuple[str, str]]) -> tuple:
+        """Cache key with the query normalized to sorted (name, value) pairs."""
+        return (str(tenant_id), path.rstrip("/"), tuple(sorted(query_items)))
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: tuple, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tenant_id, route: str):
+        """Drop every entry of a tenant under a route prefix (after a write)."""
+        tenant_id = str(tenant_id)
+        stale = [
+            key for key in self._entries
+            if key[0] == tenant_id and (key[1] == route or key[1].startswith(route + "/"))
+        ]
+        for key in stale:
+            self._remove(key)
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
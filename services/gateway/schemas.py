@@ -0,0 +1,33 @@
+"""API gateway Pydantic schemas for API validation."""
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+class BatchSubRequest(BaseModel):
+    """A single API call inside a batch."""
+    
+    method: str = Field("GET", pattern="^(GET|POST|PUT|PATCH|DELETE)$", description="HTTP method")
+    path: str = Field(..., pattern="^/api/v1/", description="Gateway path, optionally with a query string")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Extra request headers")
+    body: Optional[Any] = Field(None, description="JSON request body")
+
+
+class BatchRequest(BaseModel):
+    """Schema for a batch of sub-requests."""
+    
+    requests: List[BatchSubRequest] = Field(..., min_length=1, description="Sub-requests to run")
+
+
+class BatchSubResponse(BaseModel):
+    """Result of one sub-request."""
+    
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch results, in request order."""
+    
+    responses: List[BatchSubResponse]
@@ -0,0 +1,384 @@
+"""Upstream service clients for the API gateway."""
+
+import asyncio
+import os
+import random
+import time
+from typing import Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from resilience import CircuitBreaker, CircuitOpenError, RetryBudget
+
+# Upstream status codes that count as a failure for retries and the breaker
+FAILURE_STATUS_CODES = frozenset({502, 503, 504})
+
+# Methods that may safely be sent more than once
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+class Replica:
+    """One instance of an upstream service and its load-balancing state."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        # Maintained by the background health prober
+        self.healthy = True
+
+    @property
+    def available(self) -> bool:
+        """Whether the replica passes health probes and is not ejected."""
+        return self.healthy and time.monotonic() >= self.ejected_until
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "available": self.available,
+            "healthy": self.healthy,
+            "consecutive_failures": self.consecutive_failures,
+            "ejections": self.ejections,
+        }
+
+
+class Upstream:
+    """A backend service reached through its own pooled HTTP client.
+
+    Every upstream gets a separate connection pool, so a slow service can
+    only exhaust its own connections and never those of its neighbours.
+    The service may run as several replicas; each request goes to the
+    replica with the fewest outstanding requests (``least_outstanding``) or
+    the better of two random picks (``p2c``). Replicas that cannot be
+    reached (transport errors, connect timeouts) in ``eject_after``
+    consecutive client requests are skipped for ``eject_duration`` seconds;
+    502/503/504 responses count toward the circuit breaker only.
+
+    Requests pass through a circuit breaker that fails fast while the
+    upstream is erroring. Idempotent requests are retried on another
+    replica up to ``max_retries`` times, and GETs still waiting after
+    ``hedge_delay`` seconds get a second, hedged copy; both are limited by
+    a shared retry budget.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        strategy: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_duration: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        max_retries: int = 2,
+        hedge_delay: float = 0.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        pool_timeout: float = 5.0,
+    ):
+        self.name = name
+        self.replicas = [Replica(url) for url in urls]
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_duration = eject_duration
+        self.breaker = breaker or CircuitBreaker()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.max_retries = max_retries
+        self.hedge_delay = hedge_delay
+        self.retries = 0
+        self.hedges = 0
+        self.max_connections = max_connections
+        self.http2 = http2
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                read_timeout,
+                connect=connect_timeout,
+                pool=pool_timeout,
+            ),
+            http2=http2,
+        )
+
+    @classmethod
+    def from_env(cls, name: str, env_prefix: str, default_url: str) -> "Upstream":
+        """Build an upstream from ``<PREFIX>_URL`` and its tuning variables.
+
+        ``<PREFIX>_URL`` may list several comma-separated replica URLs.
+        For ``env_prefix="CONTACT_SERVICE"`` this also reads
+        ``CONTACT_SERVICE_LB_STRATEGY``, ``CONTACT_SERVICE_EJECT_AFTER``,
+        ``CONTACT_SERVICE_EJECT_DURATION``, ``CONTACT_SERVICE_BREAKER_FAILURE_RATIO``,
+        ``CONTACT_SERVICE_BREAKER_MIN_REQUESTS``, ``CONTACT_SERVICE_BREAKER_WINDOW``,
+        ``CONTACT_SERVICE_BREAKER_OPEN_DURATION``, ``CONTACT_SERVICE_MAX_RETRIES``,
+        ``CONTACT_SERVICE_RETRY_BUDGET_RATIO``, ``CONTACT_SERVICE_RETRY_MIN_PER_SECOND``,
+        ``CONTACT_SERVICE_HEDGE_DELAY``, ``CONTACT_SERVICE_MAX_CONNECTIONS``,
+        ``CONTACT_SERVICE_MAX_KEEPALIVE``,
+        ``CONTACT_SERVICE_KEEPALIVE_EXPIRY``, ``CONTACT_SERVICE_HTTP2``,
+        ``CONTACT_SERVICE_CONNECT_TIMEOUT``, ``CONTACT_SERVICE_READ_TIMEOUT``
+        and ``CONTACT_SERVICE_POOL_TIMEOUT``.
+        """
+        urls = [
+            url.strip() for url in os.getenv(f"{env_prefix}_URL", default_url).split(",")
+            if url.strip()
+        ]
+        return cls(
+            name=name,
+            urls=urls,
+            strategy=os.getenv(f"{env_prefix}_LB_STRATEGY", "least_outstanding"),
+            eject_after=_env_int(f"{env_prefix}_EJECT_AFTER", 3),
+            eject_duration=_env_float(f"{env_prefix}_EJECT_DURATION", 30.0),
+            breaker=CircuitBreaker(
+                failure_ratio=_env_float(f"{env_prefix}_BREAKER_FAILURE_RATIO", 0.5),
+                min_requests=_env_int(f"{env_prefix}_BREAKER_MIN_REQUESTS", 20),
+                window=_env_int(f"{env_prefix}_BREAKER_WINDOW", 10),
+                open_duration=_env_float(f"{env_prefix}_BREAKER_OPEN_DURATION", 30.0),
+            ),
+            retry_budget=RetryBudget(
+                ratio=_env_float(f"{env_prefix}_RETRY_BUDGET_RATIO", 0.2),
+                min_per_second=_env_float(f"{env_prefix}_RETRY_MIN_PER_SECOND", 5.0),
+            ),
+            max_retries=_env_int(f"{env_prefix}_MAX_RETRIES", 2),
+            hedge_delay=_env_float(f"{env_prefix}_HEDGE_DELAY", 0.0),
+            max_connections=_env_int(f"{env_prefix}_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=_env_int(f"{env_prefix}_MAX_KEEPALIVE", 20),
+            keepalive_expiry=_env_float(f"{env_prefix}_KEEPALIVE_EXPIRY", 5.0),
+            http2=_env_bool(f"{env_prefix}_HTTP2", False),
+            connect_timeout=_env_float(f"{env_prefix}_CONNECT_TIMEOUT", 5.0),
+            read_timeout=_env_float(f"{env_prefix}_READ_TIMEOUT", 30.0),
+            pool_timeout=_env_float(f"{env_prefix}_POOL_TIMEOUT", 5.0),
+        )
+
+    def select_replica(self, exclude: Iterable[Replica] = ()) -> Replica:
+        """Pick the replica for the next request.
+
+        Unhealthy and ejected replicas are skipped unless no replica is
+        available, in which case all of them are considered again rather
+        than failing.
+        Replicas in ``exclude`` (already tried) are avoided when possible.
+        """
+        candidates = [replica for replica in self.replicas if replica.available] or self.replicas
+        candidates = [replica for replica in candidates if replica not in exclude] or candidates
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if self.strategy == "p2c":
+            first, second = random.sample(candidates, 2)
+            return first if first.outstanding <= second.outstanding else second
+
+        fewest = min(replica.outstanding for replica in candidates)
+        return random.choice([
+            replica for replica in candidates if replica.outstanding == fewest
+        ])
+
+    def record_success(self, replica: Replica):
+        replica.consecutive_failures = 0
+        self.breaker.record_success()
+
+    def record_failure(self, replica: Replica, eject: bool = True):
+        """Count a failed request and, with ``eject``, eject the replica if it keeps failing."""
+        self.breaker.record_failure()
+        if not eject:
+            return
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self.eject_after:
+            replica.ejected_until = time.monotonic() + self.eject_duration
+            replica.consecutive_failures = 0
+            replica.ejections += 1
+
+    def record_status(self, replica: Replica, status_code: int):
+        if status_code in FAILURE_STATUS_CODES:
+            # The replica answered, so application errors do not eject it
+            self.record_failure(replica, eject=False)
+        else:
+            self.record_success(replica)
+
+    async def send(
+        self,
+        method: str,
+        path: str,
+        headers=None,
+        content=None,
+        stream: bool = False,
+    ) -> Tuple[httpx.Response, Replica]:
+        """Send a request to a selected replica.
+
+        Raises ``CircuitOpenError`` without contacting the upstream while
+        the circuit is open. Requests with a replayable body (none, or
+        bytes) and an idempotent method are retried on transport errors and
+        502/503/504 responses. With ``stream=True`` the response body is
+        not read and the caller must hand the result to ``release``.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+        self.retry_budget.deposit()
+
+        replayable = content is None or isinstance(content, bytes)
+        attempts = 1 + (self.max_retries if method in IDEMPOTENT_METHODS and replayable else 0)
+        hedge = self.hedge_delay > 0 and method == "GET" and len(self.replicas) > 1
+
+        tried: List[Replica] = []
+        # Replicas already charged a transport failure for this client request
+        failed: Set[Replica] = set()
+        attempt = 0
+        while True:
+            try:
+                if hedge:
+                    response, replica = await self._hedged_attempt(method, path, headers, stream, tried, failed)
+                else:
+                    replica = self.select_replica(exclude=tried)
+                    tried.append(replica)
+                    response = await self._attempt(replica, method, path, headers, content, stream, failed)
+            except httpx.TransportError:
+                if not self._may_retry(attempt, attempts):
+                    raise
+                attempt += 1
+                continue
+
+            if response.status_code in FAILURE_STATUS_CODES and self._may_retry(attempt, attempts):
+                if stream:
+                    await self.release(response, replica)
+                attempt += 1
+                continue
+            return response, replica
+
+    def _may_retry(self, attempt: int, attempts: int) -> bool:
+        """Whether another attempt is allowed, withdrawing from the budget if so."""
+        if attempt + 1 >= attempts or self.breaker.state != CircuitBreaker.CLOSED:
+            return False
+        if not self.retry_budget.withdraw():
+            return False
+        self.retries += 1
+        return True
+
+    async def _attempt(
+        self, replica: Replica, method: str, path: str, headers, content, stream: bool, failed: Set[Replica]
+    ) -> httpx.Response:
+        request = self.client.build_request(method, f"{replica.url}{path}", headers=headers, content=content)
+        replica.outstanding += 1
+        try:
+            response = await self.client.send(request, stream=stream)
+        except BaseException as exc:
+            replica.outstanding -= 1
+            if isinstance(exc, httpx.TransportError):
+                self.record_failure(replica, eject=replica not in failed)
+                failed.add(replica)
+            raise
+
+        if not stream:
+            replica.outstanding -= 1
+        self.record_status(replica, response.status_code)
+        return response
+
+    async def _hedged_attempt(
+        self, method: str, path: str, headers, stream: bool, tried: List[Replica], failed: Set[Replica]
+    ):
+        """Send a GET and, if it is still pending after ``hedge_delay``,
+        race it against a copy on a different replica."""
+        primary_replica = self.select_replica(exclude=tried)
+        tried.append(primary_replica)
+        winner = None
+        racers = {
+            asyncio.ensure_future(self._attempt(primary_replica, method, path, headers, None, stream, failed)): primary_replica
+        }
+
+        try:
+            done, _ = await asyncio.wait(racers, timeout=self.hedge_delay)
+            if not done and self.retry_budget.withdraw():
+                self.hedges += 1
+                hedge_replica = self.select_replica(exclude=tried)
+                tried.append(hedge_replica)
+                racers[asyncio.ensure_future(
+                    self._attempt(hedge_replica, method, path, headers, None, stream, failed)
+                )] = hedge_replica
+
+            pending = set(racers)
+            first_error = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = winner or task
+                    else:
+                        first_error = first_error or task.exception()
+            if winner is None:
+                raise first_error
+            return winner.result(), racers[winner]
+        finally:
+            for task, replica in racers.items():
+                if task is winner:
+                    continue
+                task.cancel()
+                task.add_done_callback(self._discard_loser(replica, stream))
+
+    def _discard_loser(self, replica: Replica, stream: bool):
+        """Done-callback that closes a hedged response nobody will read."""
+        def discard(task: asyncio.Future):
+            if task.cancelled() or task.exception() is not None:
+                return
+            if stream:
+                asyncio.ensure_future(self.release(task.result(), replica))
+        return discard
+
+    async def release(self, response: httpx.Response, replica: Replica):
+        """Close a streamed response and return its replica slot."""
+        await response.aclose()
+        replica.outstanding -= 1
+
+    async def request(self, method: str, path: str, headers=None, content=None) -> httpx.Response:
+        """Send a buffered request to a selected replica."""
+        response, _ = await self.send(method, path, headers=headers, content=content)
+        return response
+
+    def pool_stats(self) -> dict:
+        """Live connection pool usage: connections in use, idle and waiters."""
+        pool = getattr(self.client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        waiting = [
+            queued for queued in getattr(pool, "_requests", [])
+            if getattr(queued, "connection", None) is None
+        ]
+        return {
+            "max_connections": self.max_connections,
+            "http2": self.http2,
+            "in_use": sum(1 for conn in connections if not conn.is_idle() and not conn.is_closed()),
+            "idle": sum(1 for conn in connections if conn.is_idle()),
+            "waiters": len(waiting),
+        }
+
+    def replica_stats(self) -> List[dict]:
+        return [replica.stats() for replica in self.replicas]
+
+    def resilience_stats(self) -> dict:
+        return {
+            "breaker": self.breaker.stats(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "retry_budget_balance": round(self.retry_budget.balance, 2),
+            "retry_budget_rejected": self.retry_budget.rejected,
+        }
+
+    async def close(self):
+        """Close all pooled connections."""
+        await self.client.aclose()
@@ -3,6 +3,7 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 from typing import List, Optional
 
 from models import Lead, Base, LeadStatus, LeadSource
@@ -11,13 +12,14 @@ from schemas import (
     LeadSearchQuery, LeadStatusUpdate, LeadAssignment,
     LeadConversion, LeadScoreBreakdown
 )
-from shared.database import DatabaseManager, get_database_url
+from repository import LeadRepository
+from shared.database import DatabaseManager, QueryStatsMiddleware, get_database_url
 from shared.cache import CacheManager
 from shared.auth import get_current_user
 
 # Initialize database
 database_url = get_database_url("leads")
-db_manager = DatabaseManager(database_url)
+db_manager = DatabaseManager(database_url, "leads")
 
 # Initialize cache
 cache_manager = CacheManager()
@@ -29,6 +31,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Per-request query count and DB time headers
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -68,6 +73,75 @@ async def health_check():
     return {"status": "healthy", "service": "lead-service"}
 
 
+@app.get("/metrics/db")
+async def db_metrics():
+    """Database connection pool usage."""
+    return db_manager.pool_stats()
+
+
+@app.get("/leads/summary")
+async def leads_summary(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Active lead counts by status, for the dashboard."""
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    
+    result = await db.execute(
+        select(Lead.status, func.count()).where(
+            Lead.tenant_id == tenant_id,
+            Lead.is_active == True
+        ).group_by(Lead.status)
+    )
+    by_status = {lead_status.value: count for lead_status, count in result.all()}
+    
+    return {"count": sum(by_status.values()), "by_status": by_status}
+
+
+@app.get("/leads", response_model=LeadList)
+async def search_leads(
+    query: str = Query(None, description="Search query"),
+    lead_status: LeadStatus = Query(None, alias="status", description="Filter by status"),
+    source: LeadSource = Query(None, description="Filter by source"),
+    priority: str = Query(None, pattern="^(low|medium|high)$", description="Filter by priority"),
+    assigned_to: int = Query(None, description="Filter by assigned user"),
+    is_qualified: bool = Query(None, description="Filter by qualification status"),
+    company: str = Query(None, description="Filter by company"),
+    industry: str = Query(None, description="Filter by industry"),
+    min_score: float = Query(None, ge=0, le=100, description="Minimum lead score"),
+    max_score: float = Query(None, ge=0, le=100, description="Maximum lead score"),
+    is_active: bool = Query(None, description="Filter by active status"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: str = Query(None, description="Next-page cursor; overrides page"),
+    sort_by: str = Query("created_at", description="Sort field"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search leads with filters and offset or cursor pagination."""
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    search_query = LeadSearchQuery(
+        query=query, status=lead_status, source=source, priority=priority,
+        assigned_to=assigned_to, is_qualified=is_qualified, company=company,
+        industry=industry, min_score=min_score, max_score=max_score,
+        is_active=is_active, page=page, page_size=page_size, cursor=cursor,
+        sort_by=sort_by, sort_order=sort_order
+    )
+    
+    leads, total, next_cursor = await LeadRepository(db).search(search_query, tenant_id)
+    
+    return LeadList(
+        leads=[LeadResponse(**lead.to_dict()) for lead in leads],
+        total=total,
+        page=search_query.page,
+        page_size=search_query.page_size,
+        has_next=next_cursor is not None,
+        has_prev=search_query.page > 1 or search_query.cursor is not None,
+        next_cursor=next_cursor
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8002)
\ No newline at end of file
@@ -1,6 +1,6 @@
 """Lead service database models."""
 
-from sqlalchemy import String, Text, Integer, Float, Enum as SqlEnum, Boolean
+from sqlalchemy import String, Text, Integer, Float, Enum as SqlEnum, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from shared.database import Base
 from typing import Optional
@@ -34,17 +34,28 @@ class Lead(Base):
     """Lead model representing potential customers."""
     
     __tablename__ = "leads"
+    __table_args__ = (
+        # Keyset search sorts: one (tenant_id, <sort column>, id) index per sort
+        Index("ix_leads_tenant_created_at", "tenant_id", "created_at", "id"),
+        Index("ix_leads_tenant_updated_at", "tenant_id", "updated_at", "id"),
+        Index("ix_leads_tenant_first_name", "tenant_id", "first_name", "id"),
+        Index("ix_leads_tenant_company", "tenant_id", "company", "id"),
+        Index("ix_leads_tenant_email", "tenant_id", "email", "id"),
+        # Dashboard counts and work queues only consider active leads
+        Index("ix_leads_tenant_active_status", "tenant_id", "status", postgresql_where=text("is_active")),
+        Index("ix_leads_tenant_active_assigned_to", "tenant_id", "assigned_to", postgresql_where=text("is_active")),
+    )
     
     # Basic Contact Information
-    first_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    last_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    email: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    first_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    last_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    email: Mapped[str] = mapped_column(String(255), nullable=False)
     phone: Mapped[Optional[str]] = mapped_column(String(20))
     
     # Company Information
-    company: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    company: Mapped[str] = mapped_column(String(200), nullable=False)
     title: Mapped[Optional[str]] = mapped_column(String(100))
-    industry: Mapped[Optional[str]] = mapped_column(String(100), index=True)
+    industry: Mapped[Optional[str]] = mapped_column(String(100))
     company_size: Mapped[Optional[str]] = mapped_column(String(50))
     annual_revenue: Mapped[Optional[str]] = mapped_column(String(50))
     
@@ -52,26 +63,24 @@ class Lead(Base):
     status: Mapped[LeadStatus] = mapped_column(
         SqlEnum(LeadStatus), 
         default=LeadStatus.NEW, 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     source: Mapped[LeadSource] = mapped_column(
         SqlEnum(LeadSource), 
         default=LeadSource.OTHER, 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     
     # Lead Scoring
-    score: Mapped[float] = mapped_column(Float, default=0.0, index=True)
-    priority: Mapped[str] = mapped_column(String(20), default="medium", index=True)  # low, medium, high
+    score: Mapped[float] = mapped_column(Float, default=0.0)
+    priority: Mapped[str] = mapped_column(String(20), default="medium")  # low, medium, high
     
     # Sales Information
     estimated_value: Mapped[Optional[float]] = mapped_column(Float)
     expected_close_date: Mapped[Optional[str]] = mapped_column(String(10))  # YYYY-MM-DD
     
     # Assignment
-    assigned_to: Mapped[Optional[int]] = mapped_column(Integer, index=True)  # User ID
+    assigned_to: Mapped[Optional[int]] = mapped_column(Integer)  # User ID
     
     # Qualification (BANT)
     budget_qualified: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -81,18 +90,18 @@ class Lead(Base):
     
     # Additional Information
     notes: Mapped[Optional[str]] = mapped_column(Text)
-    campaign: Mapped[Optional[str]] = mapped_column(String(200), index=True)
+    campaign: Mapped[Optional[str]] = mapped_column(String(200))
     utm_source: Mapped[Optional[str]] = mapped_column(String(100))
     utm_medium: Mapped[Optional[str]] = mapped_column(String(100))
     utm_campaign: Mapped[Optional[str]] = mapped_column(String(100))
     
     # Status tracking
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     converted_to_contact_id: Mapped[Optional[int]] = mapped_column(Integer)
     converted_to_opportunity_id: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Tenant isolation
-    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False)
     
     @property
     def full_name(self) -> str:
@@ -0,0 +1,100 @@
+"""Lead service repository for database operations."""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, or_, and_, not_
+from typing import List, Optional, Tuple
+from models import Lead
+from schemas import LeadSearchQuery
+from shared.pagination import page_rows, paginate
+
+
+# Sort options: ORDER BY expression and the attribute it is read from.
+# Each has a (tenant_id, <column>, id) index so keyset pages can seek.
+SORT_FIELDS = {
+    "name": (Lead.first_name, "first_name"),
+    "company": (Lead.company, "company"),
+    "email": (Lead.email, "email"),
+    "updated_at": (Lead.updated_at, "updated_at"),
+    "created_at": (Lead.created_at, "created_at"),
+}
+
+
+class LeadRepository:
+    """Repository for lead database operations."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    @staticmethod
+    def sort_key(search_query: LeadSearchQuery) -> str:
+        """Normalized sort a cursor is bound to, e.g. ``created_at:desc``."""
+        sort_by = search_query.sort_by if search_query.sort_by in SORT_FIELDS else "created_at"
+        return f"{sort_by}:{search_query.sort_order}"
+    
+    @classmethod
+    def build_search_query(cls, search_query: LeadSearchQuery, tenant_id: int):
+        """Filtered and sorted search statement, without pagination."""
+        query = select(Lead).where(Lead.tenant_id == tenant_id)
+        
+        # Apply filters
+        if search_query.query:
+            search_term = f"%{search_query.query}%"
+            query = query.where(
+                or_(
+                    Lead.first_name.ilike(search_term),
+                    Lead.last_name.ilike(search_term),
+                    Lead.email.ilike(search_term),
+                    Lead.company.ilike(search_term)
+                )
+            )
+        if search_query.status:
+            query = query.where(Lead.status == search_query.status)
+        if search_query.source:
+            query = query.where(Lead.source == search_query.source)
+        if search_query.priority:
+            query = query.where(Lead.priority == search_query.priority)
+        if search_query.assigned_to is not None:
+            query = query.where(Lead.assigned_to == search_query.assigned_to)
+        if search_query.is_qualified is not None:
+            qualified = and_(
+                Lead.budget_qualified, Lead.authority_qualified,
+                Lead.need_qualified, Lead.timeline_qualified
+            )
+            query = query.where(qualified if search_query.is_qualified else not_(qualified))
+        if search_query.company:
+            query = query.where(Lead.company.ilike(f"%{search_query.company}%"))
+        if search_query.industry:
+            query = query.where(Lead.industry == search_query.industry)
+        if search_query.min_score is not None:
+            query = query.where(Lead.score >= search_query.min_score)
+        if search_query.max_score is not None:
+            query = query.where(Lead.score <= search_query.max_score)
+        if search_query.is_active is not None:
+            query = query.where(Lead.is_active == search_query.is_active)
+        
+        # Apply sorting; id breaks ties so pages never overlap
+        sort_by, sort_order = cls.sort_key(search_query).split(":")
+        order_field = SORT_FIELDS[sort_by][0]
+        if sort_order == "desc":
+            return query.order_by(order_field.desc(), Lead.id.desc())
+        return query.order_by(order_field, Lead.id)
+    
+    async def search(self, search_query: LeadSearchQuery, tenant_id: int) -> Tuple[List[Lead], int, Optional[str]]:
+        """Search leads with offset or cursor pagination.
+        
+        Returns the leads, the total and the cursor of the next page (None
+        on the last page).
+        """
+        query = self.build_search_query(search_query, tenant_id)
+        total = (await self.db.execute(select(func.count()).select_from(query.order_by(None).subquery()))).scalar()
+        
+        sort_key = self.sort_key(search_query)
+        sort_column, sort_attribute = SORT_FIELDS[sort_key.split(":")[0]]
+        query = paginate(
+            query, sort_key, sort_column, Lead.id,
+            search_query.cursor, search_query.page, search_query.page_size
+        )
+        result = await self.db.execute(query)
+        leads, next_cursor = page_rows(result.scalars().all(), search_query.page_size, sort_key, sort_attribute)
+        
+        return leads, total, next_cursor
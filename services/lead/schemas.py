@@ -147,6 +147,7 @@ class LeadList(BaseModel):
     page_size: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, for keyset pagination")
 
 
 class LeadSearchQuery(BaseModel):
@@ -165,6 +166,7 @@ class LeadSearchQuery(BaseModel):
     is_active: Optional[bool] = Field(None, description="Filter by active status")
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(20, ge=1, le=100, description="Page size")
+    cursor: Optional[str] = Field(None, description="Next-page cursor from a previous response; overrides page")
     sort_by: str = Field("created_at", description="Sort field")
     sort_order: str = Field("desc", pattern="^(asc|desc)$", description="Sort order")
 
@@ -3,15 +3,16 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 
-from models import Opportunity, Base
-from shared.database import DatabaseManager, get_database_url
+from models import Opportunity, OpportunityStage, Base
+from shared.database import DatabaseManager, QueryStatsMiddleware, get_database_url
 from shared.cache import CacheManager
 from shared.auth import get_current_user
 
 # Initialize database
 database_url = get_database_url("opportunities")
-db_manager = DatabaseManager(database_url)
+db_manager = DatabaseManager(database_url, "opportunities")
 
 # Initialize cache
 cache_manager = CacheManager()
@@ -23,6 +24,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Per-request query count and DB time headers
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -62,6 +66,40 @@ async def health_check():
     return {"status": "healthy", "service": "opportunity-service"}
 
 
+@app.get("/metrics/db")
+async def db_metrics():
+    """Database connection pool usage."""
+    return db_manager.pool_stats()
+
+
+@app.get("/opportunities/summary")
+async def opportunities_summary(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Open pipeline count and value, for the dashboard."""
+    tenant_id = current_user["payload"].get("tenant_id", 1)
+    
+    result = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(Opportunity.value), 0.0),
+            func.coalesce(func.sum(Opportunity.expected_revenue), 0.0)
+        ).where(
+            Opportunity.tenant_id == tenant_id,
+            Opportunity.is_active == True,
+            Opportunity.stage.notin_([OpportunityStage.CLOSED_WON, OpportunityStage.CLOSED_LOST])
+        )
+    )
+    count, total_value, expected_revenue = result.one()
+    
+    return {
+        "count": count,
+        "total_value": total_value,
+        "expected_revenue": expected_revenue
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8003)
\ No newline at end of file
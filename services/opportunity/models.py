@@ -1,6 +1,6 @@
 """Opportunity service database models."""
 
-from sqlalchemy import String, Text, Integer, Float, Enum as SqlEnum, Boolean, Date
+from sqlalchemy import String, Text, Integer, Float, Enum as SqlEnum, Boolean, Date, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from shared.database import Base
 from typing import Optional
@@ -31,62 +31,69 @@ class Opportunity(Base):
     """Opportunity model representing sales deals."""
     
     __tablename__ = "opportunities"
+    __table_args__ = (
+        Index("ix_opportunities_tenant_contact_id", "tenant_id", "contact_id"),
+        # Pipeline views only consider active opportunities
+        Index("ix_opportunities_tenant_active_stage", "tenant_id", "stage", postgresql_where=text("is_active")),
+        Index(
+            "ix_opportunities_tenant_active_owner_id", "tenant_id", "owner_id", "expected_close_date",
+            postgresql_where=text("is_active")
+        ),
+    )
     
     # Basic Information
-    name: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
     
     # Financial Information
-    value: Mapped[float] = mapped_column(Float, nullable=False, index=True)
-    probability: Mapped[float] = mapped_column(Float, default=0.0, index=True)  # 0.0 to 1.0
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+    probability: Mapped[float] = mapped_column(Float, default=0.0)  # 0.0 to 1.0
     expected_revenue: Mapped[Optional[float]] = mapped_column(Float)  # value * probability
     
     # Stage and Type
     stage: Mapped[OpportunityStage] = mapped_column(
         SqlEnum(OpportunityStage), 
         default=OpportunityStage.PROSPECTING, 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     opportunity_type: Mapped[OpportunityType] = mapped_column(
         SqlEnum(OpportunityType), 
         default=OpportunityType.NEW_BUSINESS, 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     
     # Dates
-    expected_close_date: Mapped[Optional[date]] = mapped_column(Date, index=True)
-    actual_close_date: Mapped[Optional[date]] = mapped_column(Date, index=True)
+    expected_close_date: Mapped[Optional[date]] = mapped_column(Date)
+    actual_close_date: Mapped[Optional[date]] = mapped_column(Date)
     
     # Relationships
-    contact_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
-    account_company: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    contact_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    account_company: Mapped[str] = mapped_column(String(200), nullable=False)
     
     # Assignment and Ownership
-    owner_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)  # Sales rep
-    assigned_to: Mapped[Optional[int]] = mapped_column(Integer, index=True)  # Can be different from owner
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)  # Sales rep
+    assigned_to: Mapped[Optional[int]] = mapped_column(Integer)  # Can be different from owner
     
     # Sales Process
-    lead_source: Mapped[Optional[str]] = mapped_column(String(100), index=True)
+    lead_source: Mapped[Optional[str]] = mapped_column(String(100))
     competitor: Mapped[Optional[str]] = mapped_column(String(200))
     next_step: Mapped[Optional[str]] = mapped_column(String(500))
     
     # Classification
-    priority: Mapped[str] = mapped_column(String(20), default="medium", index=True)  # low, medium, high
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
+    priority: Mapped[str] = mapped_column(String(20), default="medium")  # low, medium, high
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     
     # Loss Reason (if closed lost)
     loss_reason: Mapped[Optional[str]] = mapped_column(String(200))
     
     # Campaign and Marketing
-    campaign: Mapped[Optional[str]] = mapped_column(String(200), index=True)
+    campaign: Mapped[Optional[str]] = mapped_column(String(200))
     
     # Additional Information
     notes: Mapped[Optional[str]] = mapped_column(Text)
     
     # Tenant isolation
-    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False)
     
     def update_expected_revenue(self):
         """Update expected revenue based on value and probability."""
@@ -1,23 +1,47 @@
 """Shared authentication and authorization utilities."""
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
 import os
+import threading
+import time
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+# Internal trust: the gateway signs the caller's identity with this secret
+# and backend services accept it instead of re-verifying the JWT. Unset
+# disables the mode.
+INTERNAL_IDENTITY_SECRET = os.getenv("INTERNAL_IDENTITY_SECRET", "")
+INTERNAL_IDENTITY_TTL = int(os.getenv("INTERNAL_IDENTITY_TTL", "60"))
+INTERNAL_IDENTITY_HEADER = "X-Internal-Identity"
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs in a bounded thread pool so it never blocks the event loop;
+# at most PASSWORD_HASH_MAX_PENDING jobs may be queued or running at once
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
 # Token security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -30,6 +54,56 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPool:
+    """Runs password hashing off the event loop with admission control.
+    
+    Jobs beyond ``max_pending`` are rejected with 503 straight away
+    instead of queueing, so a login burst cannot build an unbounded
+    backlog of 100ms+ bcrypt calls.
+    """
+    
+    def __init__(self, workers: int = 4, max_pending: int = 32):
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+    
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent logins, please retry",
+                headers={"Retry-After": "1"},
+            )
+        
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+    
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
@@ -43,6 +117,86 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified JWT claims.
+    
+    Entries are keyed by a SHA-256 of the token, so raw tokens are never
+    kept in memory, and expire at the token's own ``exp``. Sync dependencies
+    run in FastAPI's thread pool, hence the lock.
+    """
+    
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        """Return cached claims for a token that has not expired yet."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+    
+    def contains(self, token: str) -> bool:
+        """Whether a token has unexpired cached claims; not counted in the hit ratio."""
+        with self._lock:
+            entry = self._entries.get(self._key(token))
+            return entry is not None and entry[0] > time.time()
+    
+    def set(self, token: str, payload: dict):
+        """Cache verified claims until the token's ``exp``."""
+        exp = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (float(exp), dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = VerifiedTokenCache(TOKEN_CACHE_SIZE)
+
+
+def decode_token(token: str) -> dict:
+    """Verify a JWT and return its claims, reusing earlier verifications.
+    
+    Raises ``JWTError`` if the token is invalid or expired.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.set(token, payload)
+    return payload
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Verify JWT token and extract user info."""
     credentials_exception = HTTPException(
@@ -52,7 +206,7 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
     )
     
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
@@ -61,7 +215,94 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
         raise credentials_exception
 
 
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _identity_mac(body: str) -> str:
+    return _b64encode(hmac.new(INTERNAL_IDENTITY_SECRET.encode(), body.encode(), hashlib.sha256).digest())
+
+
+def create_identity_header(token_data: dict) -> str:
+    """Sign a verified user's claims for forwarding to backend services.
+    
+    The value is ``<base64url claims>.<base64url HMAC-SHA256>`` and expires
+    after ``INTERNAL_IDENTITY_TTL`` seconds, or with the token if sooner.
+    """
+    claims = dict(token_data["payload"])
+    expires = int(time.time()) + INTERNAL_IDENTITY_TTL
+    if isinstance(claims.get("exp"), (int, float)):
+        expires = min(expires, int(claims["exp"]))
+    claims["exp"] = expires
+    claims["sub"] = str(token_data["user_id"])
+    
+    body = _b64encode(json.dumps(claims, separators=(",", ":"), default=str).encode())
+    return f"{body}.{_identity_mac(body)}"
+
+
+def verify_identity_header(value: str) -> Optional[dict]:
+    """Return user info from a signed identity header, or None if invalid."""
+    if not INTERNAL_IDENTITY_SECRET:
+        return None
+    
+    body, _, mac = value.partition(".")
+    if not mac or not hmac.compare_digest(mac, _identity_mac(body)):
+        return None
+    
+    try:
+        claims = json.loads(_b64decode(body))
+    except ValueError:
+        return None
+    if not isinstance(claims.get("exp"), int) or claims["exp"] <= time.time() or not claims.get("sub"):
+        return None
+    return {"user_id": claims["sub"], "payload": claims}
+
+
+# Dependency for internal routes that change state (signed identity header only)
+async def get_internal_identity(request: Request) -> dict:
+    """Get the caller from a valid signed identity header; bearer tokens are not accepted."""
+    identity = request.headers.get(INTERNAL_IDENTITY_HEADER)
+    token_data = verify_identity_header(identity) if identity else None
+    if token_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate internal identity"
+        )
+    return token_data
+
+
+# Dependency for protecting routes that face clients (bearer JWT only)
+async def get_bearer_user(token_data: dict = Depends(verify_token)) -> dict:
+    """Get current authenticated user from the bearer token."""
+    return token_data
+
+
 # Dependency for protecting routes
-async def get_current_user(token_data: dict = Depends(verify_token)) -> dict:
-    """Get current authenticated user."""
-    return token_data
\ No newline at end of file
+async def get_current_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> dict:
+    """Get current authenticated user.
+    
+    Behind the gateway a valid signed identity header is accepted with a
+    cheap MAC check; otherwise the bearer JWT is verified as usual.
+    """
+    identity = request.headers.get(INTERNAL_IDENTITY_HEADER)
+    if identity and INTERNAL_IDENTITY_SECRET:
+        token_data = verify_identity_header(identity)
+        if token_data is not None:
+            return token_data
+    
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authenticated"
+        )
+    # Cached tokens are verified inline; a miss checks the signature in the thread pool
+    if token_cache.contains(credentials.credentials):
+        return verify_token(credentials)
+    return await run_in_threadpool(verify_token, credentials)
\ No newline at end of file
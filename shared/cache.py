@@ -1,35 +1,272 @@
 """Shared Redis cache utilities."""
 
-import json
+import asyncio
+import math
+import random
 import redis.asyncio as redis
-from typing import Optional, Any
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, Tuple
 import os
 
+from shared.codecs import decode, get_codec
+
+
+# Marks values written by get_or_load: {_ENVELOPE: [value, load_seconds, expires_at]}
+_ENVELOPE = "$xf"
+
+# Result handed to coalesced waiters when the loading caller failed
+_FAILED = object()
+
+# Tenants whose generation is kept in process (see CACHE_GENERATION_TTL)
+_GENERATION_ENTRIES = 10000
+
+# Release a get_or_load lock only if it is still ours
+_UNLOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _entry(raw: bytes) -> Tuple[Any, float, float]:
+    """Cached value, how long it took to load and when it expires (epoch seconds)."""
+    value = decode(raw)
+    if isinstance(value, dict) and len(value) == 1 and _ENVELOPE in value:
+        value, load_seconds, expires_at = value[_ENVELOPE]
+        return value, load_seconds, expires_at
+    return value, 0.0, math.inf
+
+
+class LocalCache:
+    """Bounded in-process LRU cache of serialized values with per-entry TTL."""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.lookup(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def lookup(self, key: str) -> Optional[bytes]:
+        """Like ``get`` but not counted in the hit ratio."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+    
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
 
 class CacheManager:
-    """Redis cache manager for caching frequently accessed data."""
+    """Redis cache manager for caching frequently accessed data.
+    
+    Optional in-process L1 (CACHE_L1_MAX_ENTRIES) in front of Redis, kept
+    coherent over pub/sub. Use ``get_or_load`` for hot read-through keys and
+    ``tenant_namespace`` / ``namespaced_key`` for tenant data; see
+    "Performance Features" in MVP_README.md.
+    """
     
     def __init__(self):
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self.redis_client = None
+        l1_max_entries = int(os.getenv("CACHE_L1_MAX_ENTRIES", "0"))
+        self.local = LocalCache(l1_max_entries, float(os.getenv("CACHE_L1_TTL", "5"))) if l1_max_entries > 0 else None
+        generation_ttl = float(os.getenv("CACHE_GENERATION_TTL", "1"))
+        self.generations = LocalCache(_GENERATION_ENTRIES, generation_ttl) if generation_ttl > 0 else None
+        self.invalidation_channel = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+        self.instance_id = uuid.uuid4().hex
+        self.codec = get_codec(os.getenv("CACHE_CODEC", "msgpack"))
+        self.lock_timeout = float(os.getenv("CACHE_LOCK_TIMEOUT", "5"))
+        self.xfetch_beta = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self._listener: Optional[asyncio.Task] = None
     
     async def connect(self):
         """Connect to Redis."""
-        self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
+        self.redis_client = redis.from_url(self.redis_url)
+        if self.local is not None and self._listener is None:
+            self._listener = asyncio.ensure_future(self._listen_for_invalidations())
     
     async def disconnect(self):
         """Disconnect from Redis."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
         if self.redis_client:
             await self.redis_client.close()
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
+    async def _listen_for_invalidations(self):
+        """Evict L1 entries written by other processes."""
+        while True:
+            try:
+                pubsub = self.redis_client.pubsub()
+                await pubsub.subscribe(self.invalidation_channel)
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        sender, _, key = message["data"].decode().partition(":")
+                        if sender != self.instance_id:
+                            self.local.discard(key)
+                            if self.generations is not None:
+                                self.generations.discard(key)
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            # Invalidations may have been missed while unsubscribed
+            self.local.clear()
+            if self.generations is not None:
+                self.generations.clear()
+            await asyncio.sleep(1.0)
+    
+    def _publish(self, pipe, key: str):
+        if self.local is not None:
+            self.local.discard(key)
+            pipe.publish(self.invalidation_channel, f"{self.instance_id}:{key}")
+    
+    async def _get_raw(self, key: str) -> Optional[bytes]:
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+        
         if not self.redis_client:
             await self.connect()
         
         value = await self.redis_client.get(key)
         if value:
-            return json.loads(value)
+            self.l2_hits += 1
+            if self.local is not None:
+                self.local.set(key, value)
+            return value
+        self.l2_misses += 1
+        return None
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache."""
+        value = await self._get_raw(key)
+        return _entry(value)[0] if value is not None else None
+    
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], expire: int = 300) -> Optional[Any]:
+        """Read-through get: return the cached value or ``await loader()`` and cache it.
+        
+        The loader runs in the calling task (it may use the caller's DB
+        session); a None result is returned but not cached.
+        """
+        while True:
+            raw = await self._get_raw(key)
+            if raw is not None:
+                value, load_seconds, expires_at = _entry(raw)
+                # XFetch: refresh early with a probability that rises as expiry nears
+                early = time.time() - load_seconds * self.xfetch_beta * math.log(1.0 - random.random())
+                if early < expires_at or key in self._loading:
+                    return value
+                return await self._load(key, loader, expire, stale=(value,))
+            
+            pending = self._loading.get(key)
+            if pending is None:
+                return await self._load(key, loader, expire)
+            value = await asyncio.shield(pending)
+            if value is not _FAILED:
+                return value
+    
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], expire: int, stale: Optional[tuple] = None):
+        # Registered before the first await so concurrent callers in this process wait for us
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        value = _FAILED
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        locked = False
+        try:
+            locked = await self.redis_client.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+            if not locked:
+                # Another process is loading: serve the stale value, or wait for its result
+                if stale is not None:
+                    value = stale[0]
+                    return value
+                raw = await self._wait_for(key, lock_key)
+                if raw is not None:
+                    value = _entry(raw)[0]
+                    return value
+            
+            started = time.monotonic()
+            try:
+                value = await loader()
+            except Exception:
+                # A failed early refresh keeps serving the still-valid value
+                if stale is None:
+                    raise
+                value = stale[0]
+                return value
+            if value is not None:
+                load_seconds = time.monotonic() - started
+                await self.set(key, {_ENVELOPE: [value, load_seconds, time.time() + expire]}, expire)
+            return value
+        finally:
+            del self._loading[key]
+            future.set_result(value)
+            if locked:
+                await self.redis_client.eval(_UNLOCK_SCRIPT, 1, lock_key, token)
+    
+    async def _wait_for(self, key: str, lock_key: str) -> Optional[bytes]:
+        """Poll for the lock holder's result until it is cached or the lock is gone."""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            raw = await self.redis_client.get(key)
+            if raw:
+                return raw
+            if not await self.redis_client.exists(lock_key):
+                return None
         return None
     
     async def set(self, key: str, value: Any, expire: int = 300) -> bool:
@@ -37,22 +274,146 @@ class CacheManager:
         if not self.redis_client:
             await self.connect()
         
-        return await self.redis_client.set(
-            key, 
-            json.dumps(value, default=str), 
-            ex=expire
-        )
+        serialized = self.codec.encode(value)
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.set(key, serialized, ex=expire)
+        self._publish(pipe, key)
+        result = (await pipe.execute())[0]
+        if self.local is not None:
+            self.local.set(key, serialized, ttl=expire)
+        return result
     
     async def delete(self, key: str) -> bool:
         """Delete key from cache."""
         if not self.redis_client:
             await self.connect()
         
-        return bool(await self.redis_client.delete(key))
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.delete(key)
+        self._publish(pipe, key)
+        return bool((await pipe.execute())[0])
+    
+    async def incr(self, key: str) -> int:
+        """Atomically increment an integer counter, creating it at 1."""
+        if not self.redis_client:
+            await self.connect()
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.incr(key)
+        self._publish(pipe, key)
+        return (await pipe.execute())[0]
+    
+    async def tenant_generation(self, tenant_id: int) -> int:
+        """Current cache generation of a tenant (0 until first bumped).
+        
+        Kept in process for CACHE_GENERATION_TTL seconds whether or not L1
+        is enabled, and not counted in the hit ratios, which describe cached
+        data only.
+        """
+        key = f"t:{tenant_id}:generation"
+        generation = self.generations.lookup(key) if self.generations is not None else None
+        if generation is None:
+            if not self.redis_client:
+                await self.connect()
+            # A tenant that was never bumped is generation 0; keep that too
+            generation = await self.redis_client.get(key) or b"0"
+            if self.generations is not None:
+                self.generations.set(key, generation)
+        return int(generation)
+    
+    async def bump_tenant_generation(self, tenant_id: int) -> int:
+        """Invalidate every tenant_key of a tenant in one operation; returns the new generation."""
+        key = f"t:{tenant_id}:generation"
+        generation = await self.incr(key)
+        if self.generations is not None:
+            self.generations.set(key, str(generation).encode())
+        return generation
+    
+    async def tenant_namespace(self, tenant_id: int) -> str:
+        """Key prefix of the tenant's current generation, e.g. ``t:7:g3``."""
+        return f"t:{tenant_id}:g{await self.tenant_generation(tenant_id)}"
+    
+    @staticmethod
+    def namespaced_key(namespace: str, entity: str, *parts: Any) -> str:
+        """Key for an entity within a tenant namespace, e.g. ``t:7:g3:contact:42``."""
+        return ":".join(map(str, (namespace, entity, *parts)))
+    
+    async def tenant_key(self, tenant_id: int, entity: str, *parts: Any) -> str:
+        """``namespaced_key`` in the tenant's current namespace, for one-off keys."""
+        return self.namespaced_key(await self.tenant_namespace(tenant_id), entity, *parts)
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values in one round trip (MGET); missing keys are left out."""
+        values = {}
+        remaining = []
+        for key in dict.fromkeys(keys):
+            cached = self.local.get(key) if self.local is not None else None
+            if cached is not None:
+                values[key] = _entry(cached)[0]
+            else:
+                remaining.append(key)
+        if not remaining:
+            return values
+        
+        if not self.redis_client:
+            await self.connect()
+        
+        for key, value in zip(remaining, await self.redis_client.mget(remaining)):
+            if value:
+                self.l2_hits += 1
+                if self.local is not None:
+                    self.local.set(key, value)
+                values[key] = _entry(value)[0]
+            else:
+                self.l2_misses += 1
+        return values
+    
+    async def set_many(self, items: Dict[str, Any], expire: int = 300):
+        """Set several values with expiration in one pipelined round trip."""
+        if not items:
+            return
+        if not self.redis_client:
+            await self.connect()
+        
+        serialized = {key: self.codec.encode(value) for key, value in items.items()}
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key, value in serialized.items():
+            pipe.set(key, value, ex=expire)
+            self._publish(pipe, key)
+        await pipe.execute()
+        if self.local is not None:
+            for key, value in serialized.items():
+                self.local.set(key, value, ttl=expire)
+    
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys in one round trip; returns how many existed."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+        if not self.redis_client:
+            await self.connect()
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        for key in keys:
+            self._publish(pipe, key)
+        return (await pipe.execute())[0]
     
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
         if not self.redis_client:
             await self.connect()
         
-        return bool(await self.redis_client.exists(key))
\ No newline at end of file
+        return bool(await self.redis_client.exists(key))
+    
+    def stats(self) -> dict:
+        """Hit ratios of the in-process L1 and of Redis (L2, consulted on L1 misses)."""
+        l2_lookups = self.l2_hits + self.l2_misses
+        return {
+            "l1": self.local.stats() if self.local is not None else {"enabled": False},
+            "l2": {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "hit_ratio": self.l2_hits / l2_lookups if l2_lookups else 0.0,
+            },
+        }
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""Serialization codecs for cached values.
+
+Every encoded value starts with a short codec/version prefix (``m1:``,
+``o1:``, ``j1:``), so readers can decode entries written by any codec
+and a new codec can be rolled out while old entries are still live.
+Values without a prefix are read as plain JSON (entries written before
+codecs existed, and raw Redis counters).
+
+Datetimes and dates round-trip as their own types; enums are stored as
+their value.
+"""
+
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, Dict
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_DATETIME_EXT = 1
+_DATE_EXT = 2
+
+
+def _tag(value: Any):
+    """JSON-compatible stand-in for values JSON has no type for."""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _untag_object(obj: dict):
+    if len(obj) == 1:
+        if "$dt" in obj:
+            return datetime.fromisoformat(obj["$dt"])
+        if "$d" in obj:
+            return date.fromisoformat(obj["$d"])
+    return obj
+
+
+def _untag(value: Any):
+    if isinstance(value, dict):
+        return _untag_object({key: _untag(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_untag(item) for item in value]
+    return value
+
+
+class JsonCodec:
+    """Standard-library JSON with tagged datetimes."""
+
+    name = "json"
+    prefix = b"j1:"
+
+    def encode(self, value: Any) -> bytes:
+        return self.prefix + json.dumps(value, default=_tag, separators=(",", ":")).encode()
+
+    def decode(self, payload: bytes) -> Any:
+        return json.loads(payload, object_hook=_untag_object)
+
+
+class OrjsonCodec:
+    """orjson with tagged datetimes."""
+
+    name = "orjson"
+    prefix = b"o1:"
+
+    def encode(self, value: Any) -> bytes:
+        return self.prefix + orjson.dumps(value, default=_tag, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+    def decode(self, payload: bytes) -> Any:
+        return _untag(orjson.loads(payload))
+
+
+class MsgpackCodec:
+    """msgpack with datetimes and dates as extension types."""
+
+    name = "msgpack"
+    prefix = b"m1:"
+
+    @staticmethod
+    def _default(value: Any):
+        if isinstance(value, datetime):
+            return msgpack.ExtType(_DATETIME_EXT, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(_DATE_EXT, value.isoformat().encode())
+        if isinstance(value, enum.Enum):
+            return value.value
+        raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes):
+        if code == _DATETIME_EXT:
+            return datetime.fromisoformat(data.decode())
+        if code == _DATE_EXT:
+            return date.fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def encode(self, value: Any) -> bytes:
+        return self.prefix + msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def decode(self, payload: bytes) -> Any:
+        return msgpack.unpackb(payload, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+CODECS: Dict[str, Any] = {"json": JsonCodec()}
+if orjson is not None:
+    CODECS["orjson"] = OrjsonCodec()
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec()
+
+_BY_PREFIX = {codec.prefix: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str):
+    """Codec by name; falls back to JSON when the library is not installed."""
+    if name not in ("json", "orjson", "msgpack"):
+        raise ValueError(f"Unknown cache codec: {name}")
+    return CODECS.get(name, CODECS["json"])
+
+
+def decode(data: bytes) -> Any:
+    """Decode a value written by any codec, or an unprefixed JSON value."""
+    codec = _BY_PREFIX.get(data[:3])
+    if codec is None:
+        return json.loads(data)
+    return codec.decode(data[3:])
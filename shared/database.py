@@ -1,47 +1,396 @@
 """Shared database configuration and utilities."""
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import DateTime, func
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+from sqlalchemy import DateTime, event, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from contextvars import ContextVar
 from datetime import datetime
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, List, Optional
+import bisect
+import itertools
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
+def get_db_setting(service_name: Optional[str], name: str, default: str) -> str:
+    """Read ``<SERVICE>_DB_<NAME>``, falling back to ``DB_<NAME>`` and then ``default``."""
+    if service_name:
+        value = os.getenv(f"{service_name.upper()}_DB_{name}")
+        if value is not None:
+            return value
+    return os.getenv(f"DB_{name}", default)
+
+
+def async_database_url(database_url: str) -> str:
+    """Use the asyncpg driver for plain ``postgresql://`` URLs."""
+    if database_url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + database_url[len("postgresql://"):]
+    return database_url
+
+
+class WaitHistogram:
+    """Histogram of connection checkout wait times, bucketed by upper bound."""
+    
+    BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, wait_ms: float):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, wait_ms)] += 1
+        self.total_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+    
+    def stats(self) -> dict:
+        count = sum(self.counts)
+        labels = [f"le_{bound}ms" for bound in self.BOUNDS_MS] + ["inf"]
+        return {
+            "count": count,
+            "mean_ms": round(self.total_ms / count, 3) if count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class QueryStats:
+    """Statements issued while handling one request."""
+    
+    __slots__ = ("count", "total_ms")
+    
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+
+
+# Stats of the request being handled, set by QueryStatsMiddleware
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Describe bound parameters by type only, so slow-query logs never carry values."""
+    if executemany:
+        return f"{len(parameters)} x {parameter_shape(parameters[0]) if parameters else None}"
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware reporting the request's query count and DB time.
+    
+    Adds ``X-DB-Query-Count`` and ``X-DB-Time-Ms`` response headers. They
+    cover statements issued before the response starts; statements flushed
+    by the commit in dependency teardown are only in the debug log line.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_query_stats.reset(token)
+            logger.debug(
+                "%s %s: %d queries, %.2f ms in database",
+                scope["method"], scope["path"], stats.count, stats.total_ms
+            )
+
+
+class TrackedSession(Session):
+    """Session that remembers whether it flushed any writes."""
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+
+# Sessions whose connection is checked out lazily carry a "checkout_observer"
+# callback; the wait is the time between the transaction starting and the
+# connection being bound to it.
+@event.listens_for(TrackedSession, "after_transaction_create")
+def _start_checkout_timer(session, transaction):
+    if transaction.parent is None and "checkout_observer" in session.info:
+        session.info["checkout_started"] = time.perf_counter()
+
+
+@event.listens_for(TrackedSession, "after_begin")
+def _stop_checkout_timer(session, transaction, connection):
+    started = session.info.pop("checkout_started", None)
+    if started is not None:
+        session.info["checkout_observer"]((time.perf_counter() - started) * 1000)
+
+
 class DatabaseManager:
-    """Database connection and session management."""
+    """Database connection and session management.
+    
+    Pool settings are read per service from ``<SERVICE>_DB_<NAME>`` with a
+    shared ``DB_<NAME>`` fallback: POOL_SIZE, MAX_OVERFLOW, POOL_TIMEOUT,
+    POOL_RECYCLE, POOL_PRE_PING and STATEMENT_CACHE_SIZE (asyncpg only).
+    Each replica of a service may open up to ``pool_size + max_overflow``
+    connections, which is what has to fit in Postgres ``max_connections``.
+    
+    Read replicas are listed in REPLICA_URLS (comma separated) and picked
+    by REPLICA_ROUTING (``round_robin`` or ``least_connections``). With
+    READ_YOUR_WRITES set to a number of seconds, reads from a caller that
+    just wrote go to the primary for that long. Stickiness is tracked per
+    process only.
+    """
+    
+    def __init__(self, database_url: str, service_name: Optional[str] = None, replica_urls: Optional[List[str]] = None):
+        self.service_name = service_name
+        self.pool_size = int(get_db_setting(service_name, "POOL_SIZE", "5"))
+        self.max_overflow = int(get_db_setting(service_name, "MAX_OVERFLOW", "10"))
+        self.pool_timeout = float(get_db_setting(service_name, "POOL_TIMEOUT", "30"))
+        self.pool_recycle = int(get_db_setting(service_name, "POOL_RECYCLE", "1800"))
+        self.pool_pre_ping = get_db_setting(service_name, "POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+        self.statement_cache_size = int(get_db_setting(service_name, "STATEMENT_CACHE_SIZE", "100"))
+        
+        if replica_urls is None:
+            replica_urls = [url.strip() for url in get_db_setting(service_name, "REPLICA_URLS", "").split(",") if url.strip()]
+        self.replica_routing = get_db_setting(service_name, "REPLICA_ROUTING", "round_robin")
+        self.read_your_writes = float(get_db_setting(service_name, "READ_YOUR_WRITES", "0"))
+        self.slow_query_ms = float(get_db_setting(service_name, "SLOW_QUERY_MS", "200"))
+        self.query_count = 0
+        self.slow_queries = 0
+        self.read_only_deferrable = get_db_setting(service_name, "READ_ONLY_DEFERRABLE", "false").lower() in ("1", "true", "yes")
+        
+        self.engine = self._create_engine(database_url)
+        self.async_session = self._sessionmaker(self.engine)
+        self.read_only_session = self._sessionmaker(self._read_only(self.engine))
+        self.replica_engines = [self._create_engine(url) for url in replica_urls]
+        self.replica_sessions = [self._sessionmaker(self._read_only(engine)) for engine in self.replica_engines]
+        self._round_robin = itertools.cycle(range(len(self.replica_engines)))
+        self._recent_writers: Dict[str, float] = {}
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.wait_histogram = WaitHistogram()
+        self.checkout_timeouts = 0
+    
+    def _instrument(self, engine: AsyncEngine):
+        """Time every statement and attribute it to the current request."""
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+        
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+            self.query_count += 1
+            stats = current_query_stats.get()
+            if stats is not None:
+                stats.count += 1
+                stats.total_ms += elapsed_ms
+            if elapsed_ms >= self.slow_query_ms:
+                self.slow_queries += 1
+                logger.warning(
+                    "Slow query (%.1f ms): %s; parameters: %s",
+                    elapsed_ms, " ".join(statement.split())[:1000], parameter_shape(parameters, executemany)
+                )
+        
+        def handle_error(exception_context):
+            started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+            if started:
+                started.pop()
+        
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", handle_error)
+    
+    def _create_engine(self, database_url: str) -> AsyncEngine:
+        database_url = async_database_url(database_url)
+        connect_args = {}
+        if database_url.startswith("postgresql+asyncpg"):
+            connect_args["statement_cache_size"] = self.statement_cache_size
+        
+        # Sizing only applies to queue pools (not e.g. SQLite's NullPool/StaticPool)
+        pool_args = {}
+        url = make_url(database_url)
+        if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+            pool_args = {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "pool_timeout": self.pool_timeout,
+            }
+        
+        engine = create_async_engine(
+            database_url,
+            echo=False,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            connect_args=connect_args,
+            **pool_args
+        )
+        self._instrument(engine)
+        return engine
+    
+    def _read_only(self, engine: AsyncEngine) -> AsyncEngine:
+        """View of ``engine`` whose transactions begin as READ ONLY.
+        
+        The options are reset when the connection goes back to the pool, so
+        the same pool still serves regular sessions.
+        """
+        if engine.dialect.name != "postgresql":
+            return engine
+        options = {"postgresql_readonly": True}
+        if self.read_only_deferrable:
+            # DEFERRABLE only takes effect for SERIALIZABLE READ ONLY
+            options.update(isolation_level="SERIALIZABLE", postgresql_deferrable=True)
+        return engine.execution_options(**options)
     
-    def __init__(self, database_url: str):
-        self.engine = create_async_engine(database_url, echo=False)
-        self.async_session = async_sessionmaker(
-            bind=self.engine,
+    @staticmethod
+    def _sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+        return async_sessionmaker(
+            bind=engine,
             class_=AsyncSession,
+            sync_session_class=TrackedSession,
             expire_on_commit=False
         )
     
-    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
-        """Get database session."""
+    async def _acquire(self, session: AsyncSession):
+        """Check out the session's connection up front to time the pool wait."""
+        started = time.perf_counter()
+        try:
+            await session.connection()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        self.wait_histogram.observe((time.perf_counter() - started) * 1000)
+    
+    async def get_session(self, sticky_key: Optional[str] = None) -> AsyncGenerator[AsyncSession, None]:
+        """Get database session on the primary.
+        
+        ``sticky_key`` identifies the caller for read-your-writes routing.
+        """
         async with self.async_session() as session:
             try:
+                await self._acquire(session)
                 yield session
                 await session.commit()
             except Exception:
                 await session.rollback()
                 raise
+            finally:
+                if sticky_key and session.sync_session.info.get("wrote"):
+                    self._mark_writer(sticky_key)
+                await session.close()
+    
+    async def get_read_session(self, sticky_key: Optional[str] = None) -> AsyncGenerator[AsyncSession, None]:
+        """Get read-only database session, on a replica when one is configured.
+        
+        The transaction is READ ONLY (and DEFERRABLE with READ_ONLY_DEFERRABLE)
+        and is never committed. The connection is checked out on the first
+        query, so cache hits never touch the pool, and callers may close the
+        session as soon as their last query is done to release it before
+        the response is serialized.
+        """
+        async with self._read_sessionmaker(sticky_key)() as session:
+            # Time the pool wait when the first query checks a connection out
+            session.sync_session.info["checkout_observer"] = self.wait_histogram.observe
+            try:
+                yield session
+            except PoolTimeoutError:
+                self.checkout_timeouts += 1
+                raise
             finally:
                 await session.close()
     
+    def _read_sessionmaker(self, sticky_key: Optional[str]) -> async_sessionmaker:
+        if not self.replica_engines or (sticky_key and self._wrote_recently(sticky_key)):
+            self.primary_reads += 1
+            return self.read_only_session
+        
+        self.replica_reads += 1
+        if self.replica_routing == "least_connections":
+            index = min(
+                range(len(self.replica_engines)),
+                key=lambda i: self.replica_engines[i].sync_engine.pool.checkedout()
+            )
+        else:
+            index = next(self._round_robin)
+        return self.replica_sessions[index]
+    
+    def _mark_writer(self, sticky_key: str):
+        if self.read_your_writes <= 0:
+            return
+        now = time.monotonic()
+        if len(self._recent_writers) > 10000:
+            self._recent_writers = {
+                key: until for key, until in self._recent_writers.items() if until > now
+            }
+        self._recent_writers[sticky_key] = now + self.read_your_writes
+    
+    def _wrote_recently(self, sticky_key: str) -> bool:
+        until = self._recent_writers.get(sticky_key)
+        return until is not None and until > time.monotonic()
+    
+    @staticmethod
+    def _engine_pool_stats(engine: AsyncEngine) -> dict:
+        pool = engine.sync_engine.pool
+        if not hasattr(pool, "checkedout"):
+            return {}
+        return {
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        }
+    
+    def pool_stats(self) -> dict:
+        """Pool occupancy and checkout wait times."""
+        stats = {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "max_connections": self.pool_size + self.max_overflow,
+            "checkout_timeouts": self.checkout_timeouts,
+            "wait": self.wait_histogram.stats(),
+            "queries": {"count": self.query_count, "slow": self.slow_queries, "slow_threshold_ms": self.slow_query_ms},
+            **self._engine_pool_stats(self.engine),
+        }
+        if self.replica_engines:
+            stats["replicas"] = [
+                {"url": engine.url.render_as_string(hide_password=True), **self._engine_pool_stats(engine)}
+                for engine in self.replica_engines
+            ]
+            stats["reads"] = {"replica": self.replica_reads, "primary": self.primary_reads}
+        return stats
+    
     async def close(self):
         """Close database connection."""
         await self.engine.dispose()
+        for engine in self.replica_engines:
+            await engine.dispose()
 
 
 def get_database_url(service_name: str) -> str:
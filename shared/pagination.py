@@ -0,0 +1,94 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Opaque cursor holding the sort it was issued for and the last row's sort key."""
+    payload = json.dumps({"s": sort, "v": [_encode_value(value) for value in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort: str, types: Sequence[Type]) -> List[Any]:
+    """Sort key values from a cursor; 400 if it is malformed or from another sort.
+
+    ``types`` is the Python type of each sort key column, in order; a
+    cursor with a different number of values or other types is rejected
+    here rather than failing in the database.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort:
+            raise ValueError("cursor was issued for a different sort")
+        values = [_decode_value(value) for value in payload["v"]]
+        if len(values) != len(types) or any(type(value) is not expected for value, expected in zip(values, types)):
+            raise ValueError("cursor does not match the sort key")
+        return values
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_filter(columns: Sequence, values: Sequence[Any], descending: bool):
+    """Rows strictly after ``values`` in ``ORDER BY columns`` order.
+
+    Uses a row comparison so Postgres can seek into a matching composite
+    index; all columns must be sorted in the same direction and be
+    non-null (coalesce nullable ones in both the ORDER BY and here).
+    """
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def paginate(query, sort_key: str, sort_column, id_column, cursor: Optional[str], page: int, page_size: int):
+    """Limit ``query`` to one page by cursor, or by ``page`` as an offset.
+
+    ``query`` must already be ordered by ``sort_column, id_column`` in the
+    direction named by ``sort_key`` (``<field>:<asc|desc>``). One extra row
+    is fetched so ``page_rows`` can tell whether there is a next page.
+    """
+    if cursor:
+        types = [sort_column.type.python_type, id_column.type.python_type]
+        values = decode_cursor(cursor, sort_key, types)
+        query = query.where(keyset_filter([sort_column, id_column], values, sort_key.endswith(":desc")))
+    else:
+        query = query.offset((page - 1) * page_size)
+    return query.limit(page_size + 1)
+
+
+def page_rows(rows: Sequence[Any], page_size: int, sort_key: str, sort_attribute: str) -> Tuple[List[Any], Optional[str]]:
+    """The rows of a ``paginate`` page and the cursor of the next page (None on the last)."""
+    rows = list(rows)
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last_value = getattr(rows[-1], sort_attribute)
+    # Matches the coalesced ORDER BY of nullable sort columns
+    return rows, encode_cursor(sort_key, ["" if last_value is None else last_value, rows[-1].id])